@@ -1,629 +1,521 @@
-from OpenGL.GL import *
-from OpenGL.GLU import *
-from OpenGL.GLUT import *
-import math, random, time
-
-W, H = 1300, 980
-ASPECT, FOVY = W / H, 65.0
-first_person = False
-tp_orbit_deg = 36.0
-tp_height = 720.0
-tp_radius = 1180.0
-
-EYE_Z = 148.0
-FP_EYE_PUSH = 16.0
-FP_EYE_UP   = 10.0
-
-BD_POLY_BASE = [
-    (-300,120),(-280,180),(-260,220),(-230,240),(-190,250),
-    (-150,220),(-110,240),(-70,200),(-35,230),(5,200),
-    (35,220),(70,185),(105,195),(140,150),(120,115),
-    (150,80),(120,20),(85,0),(45,-30),(10,-70),
-    (-35,-105),(-45,-150),(-110,-180),(-160,-160),(-200,-120),
-    (-242,-75),(-262,-25),(-280,35),(-295,90)
-]
-MAP_SCALE = 7.5
-BD_POLY = [(x*MAP_SCALE, y*MAP_SCALE) for (x,y) in BD_POLY_BASE]
-MAP_MIN_X = min(x for x,_ in BD_POLY); MAP_MAX_X = max(x for x,_ in BD_POLY)
-MAP_MIN_Y = min(y for _,y in BD_POLY); MAP_MAX_Y = max(y for _,y in BD_POLY)
-MAP_W = MAP_MAX_X - MAP_MIN_X; MAP_H = MAP_MAX_Y - MAP_MIN_Y
-MAP_RADIUS = 0.5*max(MAP_W, MAP_H)
-
-def point_in_poly(x, y, poly=BD_POLY):
-    inside = False
-    n = len(poly)
-    for i in range(n):
-        x1, y1 = poly[i]; x2, y2 = poly[(i+1) % n]
-        if ((y1 > y) != (y2 > y)) and (x < (x2-x1)*(y-y1)/(y2-y1+1e-9) + x1):
-            inside = not inside
-    return inside
-
-def rand_in_map():
-    for _ in range(8192):
-        x = random.uniform(MAP_MIN_X, MAP_MAX_X)
-        y = random.uniform(MAP_MIN_Y, MAP_MAX_Y)
-        if point_in_poly(x, y): return x, y
-    return 0.0, 0.0
-
-px, py, yaw_deg = 0.0, 0.0, 0.0
-MOVE, TURN = 16.0, 4.5
-PLAYER_R = 44.0
-
-def fwd(deg):    a = math.radians(deg); return -math.sin(a), math.cos(a)
-def rightv(deg): a = math.radians(deg); return  math.cos(a), math.sin(a)
-
-WEAPON_SWORD = "sword"
-WEAPON_GUN   = "gun"
-weapon = WEAPON_SWORD
-
-# —— sword / melee
-SWORD_SWINGS = 5
-sword_uses = SWORD_SWINGS
-sword_pick = None
-
-SWING_TIME = 0.28
-SWING_ARC_DEG = 105.0
-SWING_RANGE = 220.0
-SWING_COOLDOWN = 0.10
-_last_swing_end = 0.0
-swing_active = False
-swing_t0 = 0.0
-
-pending_break = False
-BREAK_FX_DUR = 0.7
-BREAK_SHARDS = 18
-GRAVITY_Z = -260.0
-break_fx_active = False
-break_fx_t0 = 0.0
-break_shards = []
-
-ammo = 0
-GUN_AMMO_INIT = 5
-AMMO_PACK = 5
-bullets = []
-GUN_BULLET_SPEED = 920.0
-GUN_BULLET_RADIUS = 10.0
-GUN_BULLET_TTL = 2.2
-ammo_pick = None
-gun_pick  = None
-gun_unlocked_once = False
-rab_kills_for_upgrade = 0
-gun_pending_spawn = False
-
-N_RABS = 10
-RAB_R = 40.0
-STEP_PER_SWING_RAB = 48.0
-STEP_PER_SHOT_RAB  = STEP_PER_SWING_RAB
-RAB_SLOW_SPEED = 6.0
-rabs = []
-
-has_x, has_y = 200.0*MAP_SCALE/3.2, -120.0*MAP_SCALE/3.2
-HAS_R_BODY = 54.0
-HAS_R_HEAD = 26.0
-STEP_PER_SWING_HAS = 48.0
-STEP_PER_SHOT_HAS  = STEP_PER_SWING_HAS
-win = False
-
-lives = 5
-game_over = False
-
-_q = None
-def sphere(r): gluSphere(_q, r, 24, 24)
-def cone(r,h): gluCylinder(_q, 0.0, r, h, 16, 1)
-
-def draw_text(x, y, s, font=GLUT_BITMAP_HELVETICA_18, rgb=(1,1,1)):
-    glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity(); gluOrtho2D(0, W, 0, H)
-    glMatrixMode(GL_MODELVIEW); glPushMatrix(); glLoadIdentity()
-    glColor3f(*rgb); glRasterPos2f(x, y)
-    for ch in s: glutBitmapCharacter(font, ord(ch))
-    glPopMatrix(); glMatrixMode(GL_PROJECTION); glPopMatrix(); glMatrixMode(GL_MODELVIEW)
-
-def draw_map():
-    glColor3f(0.14, 0.55, 0.26)
-    glBegin(GL_POLYGON)
-    for x,y in BD_POLY: glVertex3f(x, y, 0)
-    glEnd()
-
-def draw_player():
-    glPushMatrix(); glTranslatef(px, py, 0); glRotatef(yaw_deg, 0,0,1)
-    glColor3f(0.2, 0.95, 0.95)
-    glPushMatrix(); glTranslatef(0,0,70); glScalef(60,34,138); glutSolidCube(1.0); glPopMatrix()
-    glPushMatrix(); glTranslatef(0,0,168)
-    glColor3f(1.0, 0.85, 0.2); gluDisk(_q, 20.0, 26.0, 28, 1)
-    glColor3f(0.1, 0.3, 0.95); sphere(28.0)
-    glPopMatrix()
-    glPushMatrix(); glTranslatef(0,0,228); glColor3f(1,1,1); cone(10.0, 30.0); glPopMatrix()
-    glPopMatrix()
-
-def hand_world_pos():
-    """Approximate world position of the weapon hand in TP coordinates."""
-    fx, fy = fwd(yaw_deg)
-    hx = px + 62 * fx
-    hy = py + 62 * fy
-    hz = 124.0
-    return hx, hy, hz
-
-def draw_sword():
-    """Draw sword – TP on hand; FP overlay near camera. Hidden if broken & not swinging."""
-    should_draw = (weapon == WEAPON_SWORD) and (swing_active or (sword_uses > 0))
-    if not should_draw: return
-    ang = 0.0
-    if swing_active:
-        t = (time.time() - swing_t0) / SWING_TIME
-        ang = -60 + 120*min(max(t,0.0),1.0)
-
-    if first_person:
-        fx, fy = fwd(yaw_deg); rx, ry = rightv(yaw_deg)
-        gx = px + (FP_EYE_PUSH+12)*fx + 24*rx
-        gy = py + (FP_EYE_PUSH+12)*fy + 24*ry
-        glPushMatrix(); glTranslatef(gx, gy, EYE_Z + FP_EYE_UP)
-        glRotatef(yaw_deg, 0,0,1); glRotatef(ang, 0,0,1)
-        glColor3f(0.85,0.85,0.95); glScalef(7, 92, 7); glutSolidCube(1.0)
-        glPopMatrix()
-    else:
-        glPushMatrix(); glTranslatef(px, py, 0); glRotatef(yaw_deg, 0,0,1)
-        glTranslatef(0, 62, 124)
-        glRotatef(ang, 0,0,1)
-        glColor3f(0.85,0.85,0.95); glScalef(14, 112, 14); glutSolidCube(1.0)
-        glPopMatrix()
-
-def _draw_pistol_primitive(fp):
-    """Tiny pistol model: slide+barrel+grip (boxes), FP overlay or TP in hand."""
-    if fp:
-        fx, fy = fwd(yaw_deg); rx, ry = rightv(yaw_deg)
-        gx = px + (FP_EYE_PUSH+12)*fx + 18*rx
-        gy = py + (FP_EYE_PUSH+12)*fy + 18*ry
-        glPushMatrix(); glTranslatef(gx, gy, EYE_Z + FP_EYE_UP); glRotatef(yaw_deg, 0,0,1)
-        glPushMatrix(); glTranslatef(0, 26, 0); glScalef(8, 42, 10); glColor3f(0.2,0.2,0.22); glutSolidCube(1.0); glPopMatrix()
-        glPushMatrix(); glTranslatef(0, 44, 0); glScalef(6, 10, 8); glColor3f(0.35,0.35,0.4); glutSolidCube(1.0); glPopMatrix()
-        glPushMatrix(); glTranslatef(-8, 16, -2); glRotatef(-24, 0,0,1); glScalef(10, 22, 8); glColor3f(0.1,0.1,0.12); glutSolidCube(1.0); glPopMatrix()
-        glPopMatrix()
-    else:
-        glPushMatrix(); glTranslatef(px, py, 0); glRotatef(yaw_deg, 0,0,1); glTranslatef(0, 62, 124)
-        glPushMatrix(); glTranslatef(0, 30, 0); glScalef(14, 52, 16); glColor3f(0.2,0.2,0.22); glutSolidCube(1.0); glPopMatrix()
-        glPushMatrix(); glTranslatef(0, 58, 0); glScalef(10, 14, 12); glColor3f(0.35,0.35,0.4); glutSolidCube(1.0); glPopMatrix()
-        glPushMatrix(); glTranslatef(-10, 22, -2); glRotatef(-24, 0,0,1); glScalef(16, 28, 12); glColor3f(0.1,0.1,0.12); glutSolidCube(1.0); glPopMatrix()
-        glPopMatrix()
-
-def draw_gun():
-    if weapon != WEAPON_GUN: return
-    _draw_pistol_primitive(first_person)
-
-def draw_break_fx():
-    if not break_fx_active: return
-    glColor3f(0.9,0.9,1.0)
-    for s in break_shards:
-        glPushMatrix()
-        glTranslatef(s["x"], s["y"], s["z"])
-        glRotatef(s["rot"], 0,0,1)
-        glScalef(s["sx"], s["sy"], s["sz"])
-        glutSolidCube(1.0)
-        glPopMatrix()
-
-def draw_rab(e):
-    glPushMatrix(); glTranslatef(e["x"], e["y"], 0)
-    glColor3f(0,0,0)
-    glPushMatrix(); glTranslatef(0,0,RAB_R); sphere(RAB_R); glPopMatrix()
-    glPushMatrix(); glTranslatef(0,0,RAB_R*2 + 5); sphere(RAB_R*0.7); glPopMatrix()
-    glColor3f(0.35, 0.08, 0.08)
-    glPushMatrix(); glTranslatef(-12,8,RAB_R*2 + 22); glRotatef(-18,1,0,0); cone(6.0, 18); glPopMatrix()
-    glPushMatrix(); glTranslatef( 12,8,RAB_R*2 + 22); glRotatef(-18,1,0,0); cone(6.0, 18); glPopMatrix()
-    glPopMatrix()
-
-def draw_hasina():
-    if win: return
-    glPushMatrix(); glTranslatef(has_x, has_y, 0)
-    glColor3f(1,1,1); glPushMatrix(); glTranslatef(0,0,HAS_R_BODY); sphere(HAS_R_BODY); glPopMatrix()
-    glColor3f(1,1,1); glPushMatrix(); glTranslatef(0,0,HAS_R_BODY*2 + 6); sphere(HAS_R_HEAD); glPopMatrix()
-    glPopMatrix()
-
-def draw_bullets():
-    if not bullets: return
-    glColor3f(1.0, 0.9, 0.2)
-    for b in bullets:
-        glPushMatrix()
-        glTranslatef(b["x"], b["y"], b["z"])
-        glutSolidSphere(GUN_BULLET_RADIUS, 12, 12)
-        glPopMatrix()
-
-def pickup_busy():
-    return (sword_pick is not None) or (ammo_pick is not None) or (gun_pick is not None)
-
-def draw_sword_pickup():
-    if sword_pick is None: return
-    t = glutGet(GLUT_ELAPSED_TIME)/1000.0
-    glPushMatrix()
-    glTranslatef(sword_pick["x"], sword_pick["y"], 20.0)
-    glRotatef((t*90.0)%360.0, 0,0,1)
-    glColor3f(0.1, 0.9, 0.3); glScalef(30,30,12); glutSolidCube(1.0); glScalef(1/30,1/30,1/12)
-    glColor3f(0.95,0.95,1.0); glScalef(9, 160, 9); glutSolidCube(1.0)
-    glPopMatrix()
-
-def _draw_pistol_geometry_local():
-    """Same pistol geometry as in-hand, drawn at local origin (facing +Y)."""
-    glPushMatrix(); glTranslatef(0, 30, 0); glScalef(14, 52, 16); glColor3f(0.2,0.2,0.22); glutSolidCube(1.0); glPopMatrix()
-    glPushMatrix(); glTranslatef(0, 58, 0); glScalef(10, 14, 12); glColor3f(0.35,0.35,0.4); glutSolidCube(1.0); glPopMatrix()
-    glPushMatrix(); glTranslatef(-10, 22, -2); glRotatef(-24, 0,0,1); glScalef(16, 28, 12); glColor3f(0.1,0.1,0.12); glutSolidCube(1.0); glPopMatrix()
-
-def draw_ammo_pickup():
-    if ammo_pick is None: return
-    t = glutGet(GLUT_ELAPSED_TIME)/1000.0
-    glPushMatrix()
-    glTranslatef(ammo_pick["x"], ammo_pick["y"], 22.0)
-    glRotatef((t*120.0)%360.0, 0,0,1)
-    glColor3f(0.2, 1.0, 0.4); glScalef(34,34,16); glutSolidCube(1.0)
-    glPopMatrix()
-
-def draw_gun_pickup():
-    if gun_pick is None: return
-    t = glutGet(GLUT_ELAPSED_TIME)/1000.0
-    glPushMatrix()
-    glTranslatef(gun_pick["x"], gun_pick["y"], 26.0)
-    glPushMatrix(); glScalef(26,26,12); glColor3f(0.15, 0.6, 0.95); glutSolidCube(1.0); glPopMatrix()
-    glRotatef((t*60.0)%360.0, 0,0,1)
-    _draw_pistol_geometry_local()
-    glPopMatrix()
-
-def setup_camera():
-    glMatrixMode(GL_PROJECTION); glLoadIdentity(); gluPerspective(FOVY, ASPECT, 0.3, 9000.0)
-    glMatrixMode(GL_MODELVIEW); glLoadIdentity()
-
-    fx, fy = fwd(yaw_deg)
-    if first_person:
-        eye_x = px + FP_EYE_PUSH*fx
-        eye_y = py + FP_EYE_PUSH*fy
-        eye_z = EYE_Z + FP_EYE_UP
-        gluLookAt(eye_x, eye_y, eye_z, eye_x + 60*fx, eye_y + 60*fy, eye_z, 0, 0, 1)
-    else:
-        ang = math.radians(tp_orbit_deg)
-        cx = px + tp_radius*math.cos(ang)
-        cy = py + tp_radius*math.sin(ang)
-        gluLookAt(cx, cy, tp_height, px, py, 60, 0, 0, 1)
-
-def retune_camera_for_map():
-    global tp_radius, tp_height
-    tp_radius = MAP_RADIUS * 2.3
-    tp_height = MAP_RADIUS * 1.12
-
-def spawn_rab():
-    x, y = rand_in_map()
-    rabs.append({"x": x, "y": y, "phase": random.random()*6.283})
-
-def ensure_rab_count():
-    while len(rabs) < N_RABS: spawn_rab()
-
-def per_swing_steps():
-    for e in rabs:
-        dx, dy = px - e["x"], py - e["y"]
-        d = max(1e-6, math.hypot(dx, dy))
-        nx, ny = e["x"] + STEP_PER_SWING_RAB*dx/d, e["y"] + STEP_PER_SWING_RAB*dy/d
-        if point_in_poly(nx, ny): e["x"], e["y"] = nx, ny
-    global has_x, has_y
-    dx, dy = has_x - px, has_y - py
-    d = max(1e-6, math.hypot(dx, dy))
-    nx, ny = has_x + STEP_PER_SWING_HAS*dx/d, has_y + STEP_PER_SWING_HAS*dy/d
-    if point_in_poly(nx, ny): has_x, has_y = nx, ny
-
-def per_shot_steps():
-    for e in rabs:
-        dx, dy = px - e["x"], py - e["y"]
-        d = max(1e-6, math.hypot(dx, dy))
-        nx, ny = e["x"] + STEP_PER_SHOT_RAB*dx/d, e["y"] + STEP_PER_SHOT_RAB*dy/d
-        if point_in_poly(nx, ny): e["x"], e["y"] = nx, ny
-    global has_x, has_y
-    dx, dy = has_x - px, has_y - py
-    d = max(1e-6, math.hypot(dx, dy))
-    nx, ny = has_x + STEP_PER_SHOT_HAS*dx/d, has_y + STEP_PER_SHOT_HAS*dy/d
-    if point_in_poly(nx, ny): has_x, has_y = nx, ny
-
-def trigger_break_fx():
-    """Spawn shard particles at the sword hand and start break animation."""
-    global break_fx_active, break_fx_t0, break_shards
-    hx, hy, hz = hand_world_pos()
-    break_shards = []
-    for _ in range(BREAK_SHARDS):
-        ang = math.radians(yaw_deg + random.uniform(-70, 70))
-        spd = random.uniform(200, 340)
-        vx, vy = spd * math.cos(ang), spd * math.sin(ang)
-        vz = random.uniform(160, 280)
-        shard = {
-            "x": hx, "y": hy, "z": hz,
-            "vx": vx, "vy": vy, "vz": vz,
-            "rot": random.uniform(0,360), "rv": random.uniform(-360,360),
-            "sx": random.uniform(7,14), "sy": random.uniform(12,24), "sz": random.uniform(5,10)
-        }
-        break_shards.append(shard)
-    break_fx_active = True
-    break_fx_t0 = time.time()
-
-def begin_swing():
-    global swing_active, swing_t0, sword_uses, _last_swing_end, pending_break
-    if weapon != WEAPON_SWORD: return
-    if game_over or win or swing_active: return
-    if sword_uses <= 0: return
-    if time.time() - _last_swing_end < SWING_COOLDOWN: return
-    swing_active = True
-    swing_t0 = time.time()
-    sword_uses -= 1
-    if sword_uses == 0:
-        pending_break = True
-        if not pickup_busy():
-            spawn_sword_pick()
-    per_swing_steps()
-
-def end_swing():
-    global swing_active, _last_swing_end, pending_break
-    swing_active = False
-    _last_swing_end = time.time()
-    if pending_break:
-        trigger_break_fx()
-        pending_break = False
-
-def spawn_sword_pick():
-    global sword_pick
-    if not pickup_busy():
-        x, y = rand_in_map(); sword_pick = {"x": x, "y": y}
-
-def spawn_gun_pick():
-    """Spawn gun upgrade ONLY if you don't already have a gun/ammo and no other pickup is active."""
-    global gun_pick, gun_pending_spawn
-    if weapon == WEAPON_GUN or ammo > 0 or gun_unlocked_once:
-        gun_pending_spawn = False
-        return
-    if not pickup_busy():
-        x, y = rand_in_map(); gun_pick = {"x": x, "y": y}
-        gun_pending_spawn = False
-    else:
-        gun_pending_spawn = True
-
-def spawn_ammo_pick():
-    global ammo_pick
-    if not pickup_busy():
-        x, y = rand_in_map(); ammo_pick = {"x": x, "y": y}
-
-def muzzle(fp):
-    """Compute muzzle (for gun) based on FP/TP."""
-    if fp:
-        fx, fy = fwd(yaw_deg); rx, ry = rightv(yaw_deg)
-        gx = px + 24*fx + 10*rx; gy = py + 24*fy + 10*ry
-        mx = gx + 30*fx; my = gy + 30*fy; mz = 88.0
-        return mx, my, mz, fx, fy
-    else:
-        fx, fy = fwd(yaw_deg)
-        mx = px + 62*fx; my = py + 62*fy; mz = 84.0
-        return mx, my, mz, fx, fy
-
-def shoot_gun():
-    global ammo
-    if weapon != WEAPON_GUN: return
-    if game_over or win or ammo <= 0: return
-    mx, my, mz, fx, fy = muzzle(first_person)
-    bullets.append({"x": mx, "y": my, "z": mz, "dx": fx, "dy": fy, "t0": time.time()})
-    ammo -= 1
-    per_shot_steps()
-    if ammo == 0 and not pickup_busy():
-        spawn_ammo_pick()
-
-def reset_world():
-    global px, py, yaw_deg, rabs, has_x, has_y, sword_uses
-    global lives, game_over, win, first_person, tp_orbit_deg
-    global break_fx_active, break_shards, pending_break
-    global weapon, ammo, bullets, ammo_pick, gun_pick, gun_unlocked_once, rab_kills_for_upgrade, gun_pending_spawn
-    global sword_pick
-    px, py, yaw_deg = 0.0, 0.0, 0.0
-    rabs = []; ensure_rab_count()
-    has_x, has_y = rand_in_map()
-    sword_uses = SWORD_SWINGS; sword_pick = None
-    weapon = WEAPON_SWORD
-    ammo = 0; bullets = []; ammo_pick = None; gun_pick = None
-    gun_unlocked_once = False; rab_kills_for_upgrade = 0; gun_pending_spawn = False
-    lives = 5; game_over = False; win = False
-    first_person = False; tp_orbit_deg = 36.0
-    break_fx_active = False; break_shards = []; pending_break = False
-    retune_camera_for_map()
-    
-def key_normal(k, *_):
-    global px, py, yaw_deg
-    if k == b'\x1b': glutLeaveMainLoop(); return
-    if k == b'r': reset_world(); return
-    if game_over or win: return
-    if k in (b'w', b's'):
-        fx, fy = fwd(yaw_deg); s = MOVE if k == b'w' else -MOVE
-        nx, ny = px + s*fx, py + s*fy
-        if point_in_poly(nx, ny): px, py = nx, ny
-    if k == b'a': yaw_deg = (yaw_deg + TURN) % 360.0
-    if k == b'd': yaw_deg = (yaw_deg - TURN) % 360.0
-
-def key_special(k, *_):
-    global tp_orbit_deg, tp_height
-    if first_person: return
-    if k == GLUT_KEY_LEFT:  tp_orbit_deg -= 2.0
-    if k == GLUT_KEY_RIGHT: tp_orbit_deg += 2.0
-    if k == GLUT_KEY_UP:    tp_height += 18.0
-    if k == GLUT_KEY_DOWN:  tp_height = max(80.0, tp_height - 18.0)
-
-def mouse(btn, state, *_):
-    global first_person
-    if btn == GLUT_LEFT_BUTTON  and state == GLUT_DOWN:
-        if weapon == WEAPON_SWORD: begin_swing()
-        else:                      shoot_gun()
-    if btn == GLUT_RIGHT_BUTTON and state == GLUT_DOWN: first_person = not first_person
-
-def within_arc_and_range(tx, ty):
-    fx, fy = fwd(yaw_deg)
-    vx, vy = tx - px, ty - py
-    d = math.hypot(vx, vy)
-    if d > SWING_RANGE: return False
-    cos_th = (fx*vx + fy*vy) / (d + 1e-9)
-    return cos_th >= math.cos(math.radians(SWING_ARC_DEG * 0.5))
-
-def update(dt):
-    global lives, game_over, win, sword_pick, ammo_pick, gun_pick
-    global rab_kills_for_upgrade, gun_unlocked_once
-    global weapon, ammo, bullets, sword_uses, gun_pending_spawn
-    global break_fx_active, break_shards, break_fx_t0
-
-    if swing_active and (time.time() - swing_t0 >= SWING_TIME):
-        end_swing()
-
-    if not (game_over or win):
-        if RAB_SLOW_SPEED > 0.0:
-            for e in rabs:
-                dx, dy = px - e["x"], py - e["y"]
-                d = max(1e-6, math.hypot(dx, dy))
-                step = RAB_SLOW_SPEED * dt
-                nx, ny = e["x"] + step*dx/d, e["y"] + step*dy/d
-                if point_in_poly(nx, ny): e["x"], e["y"] = nx, ny
-
-        if swing_active and weapon == WEAPON_SWORD:
-            survivors = []
-            for e in rabs:
-                if within_arc_and_range(e["x"], e["y"]):
-                    rab_kills_for_upgrade += 1
-                    continue
-                survivors.append(e)
-            rabs[:] = survivors
-            ensure_rab_count()
-            if within_arc_and_range(has_x, has_y):
-                win = True
-
-        if weapon == WEAPON_GUN and bullets:
-            now = time.time()
-            keep = []
-            for b in bullets:
-                b["x"] += b["dx"] * GUN_BULLET_SPEED * dt
-                b["y"] += b["dy"] * GUN_BULLET_SPEED * dt
-                if now - b["t0"] > GUN_BULLET_TTL: continue
-                keep.append(b)
-            bullets[:] = keep
-
-            survivors = []
-            for e in rabs:
-                killed = False
-                for b in bullets:
-                    if (e["x"]-b["x"])**2 + (e["y"]-b["y"])**2 <= (RAB_R + GUN_BULLET_RADIUS)**2:
-                        b["t0"] = -999.0; killed = True; rab_kills_for_upgrade += 1; break
-                if not killed: survivors.append(e)
-            rabs[:] = survivors; ensure_rab_count()
-            bullets[:] = [b for b in bullets if b["t0"] > 0]
-
-            for b in bullets:
-                if (has_x - b["x"])**2 + (has_y - b["y"])**2 <= (HAS_R_BODY + GUN_BULLET_RADIUS)**2:
-                    win = True; bullets.clear(); break
-
-        for i, e in enumerate(list(rabs)):
-            if (e["x"]-px)**2 + (e["y"]-py)**2 <= (RAB_R + PLAYER_R)**2:
-                lives -= 1
-                rabs[i]["x"], rabs[i]["y"] = rand_in_map()
-                if lives <= 0: game_over = True
-                break
-
-        if (not gun_unlocked_once) and (weapon == WEAPON_SWORD) and rab_kills_for_upgrade >= 10 and ammo == 0:
-            spawn_gun_pick()
-
-        if sword_pick is not None:
-            if (sword_pick["x"]-px)**2 + (sword_pick["y"]-py)**2 <= (PLAYER_R + 22)**2 and weapon == WEAPON_SWORD:
-                sword_pick = None
-                sword_uses = SWORD_SWINGS
-
-        if gun_pick is not None:
-            if weapon == WEAPON_GUN or ammo > 0:
-                gun_pick = None
-            elif (gun_pick["x"]-px)**2 + (gun_pick["y"]-py)**2 <= (PLAYER_R + 22)**2:
-                gun_pick = None
-                gun_unlocked_once = True
-                weapon = WEAPON_GUN
-                ammo = GUN_AMMO_INIT
-
-        if ammo_pick is not None and weapon == WEAPON_GUN:
-            if (ammo_pick["x"]-px)**2 + (ammo_pick["y"]-py)**2 <= (PLAYER_R + 22)**2:
-                ammo_pick = None
-                ammo += AMMO_PACK
-
-        if gun_pending_spawn and not pickup_busy() and weapon == WEAPON_SWORD and ammo == 0 and not gun_unlocked_once:
-            spawn_gun_pick()
-
-    if break_fx_active:
-        t = time.time() - break_fx_t0
-        if t > BREAK_FX_DUR:
-            break_fx_active = False
-            break_shards.clear()
-        else:
-            for s in break_shards:
-                s["x"] += s["vx"] * dt
-                s["y"] += s["vy"] * dt
-                s["z"] += s["vz"] * dt
-                s["vz"] += GRAVITY_Z * dt
-                s["rot"] += s["rv"] * dt
-
-def hud():
-    mode = "FIRST PERSON" if first_person else "THIRD PERSON"
-    if weapon == WEAPON_SWORD:
-        draw_text(16, H-40, f"Sword uses: {sword_uses}   Kills: {rab_kills_for_upgrade}   Lives: {lives}")
-    else:
-        draw_text(16, H-40, f"Ammo: {ammo}   Kills: {rab_kills_for_upgrade}   Lives: {lives}")
-    draw_text(W-240, H-40, mode, GLUT_BITMAP_HELVETICA_18, (0.9,0.95,1))
-    if gun_pick is not None:
-        draw_text(16, 20, "UPGRADE READY → Pick up the GUN!", GLUT_BITMAP_HELVETICA_18, (1.0,0.9,0.4))
-    elif sword_pick is not None:
-        draw_text(16, 20, "New sword spawned: pick it up (+5)", GLUT_BITMAP_HELVETICA_18, (0.6,1,0.7))
-    elif ammo_pick is not None:
-        draw_text(16, 20, "Ammo pack spawned: +5 bullets", GLUT_BITMAP_HELVETICA_18, (0.6,1,0.7))
-    if game_over:
-        draw_text(W//2-60, H//2+12, "GAME OVER", GLUT_BITMAP_HELVETICA_18, (1,0.4,0.4))
-        draw_text(W//2-150, H//2-12, "Press R to restart", GLUT_BITMAP_HELVETICA_18, (1,0.8,0.8))
-    if win:
-        draw_text(W//2-40, H//2+12, "YOU WIN!", GLUT_BITMAP_HELVETICA_18, (1,1,0.2))
-        draw_text(W//2-150, H//2-12, "Press R to restart", GLUT_BITMAP_HELVETICA_18, (1,1,0.7))
-
-_tprev = time.time()
-def display():
-    global _tprev
-    t = time.time(); dt = t - _tprev; _tprev = t
-    update(dt)
-
-    glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-    glViewport(0, 0, W, H)
-    setup_camera()
-
-    draw_map()
-    draw_sword_pickup()
-    draw_gun_pickup()
-    draw_ammo_pickup()
-    for e in rabs: draw_rab(e)
-    draw_hasina()
-    if not first_person:
-        draw_player()
-    draw_sword()
-    draw_gun()
-    draw_bullets()
-    draw_break_fx()
-    hud()
-
-    glutSwapBuffers()
-    glutPostRedisplay()
-
-def main():
-    global _q, px, py, has_x, has_y
-    random.seed()
-    if not point_in_poly(px, py): px, py = rand_in_map()
-    if not point_in_poly(has_x, has_y): has_x, has_y = rand_in_map()
-    ensure_rab_count()
-    retune_camera_for_map()
-
-    glutInit(); glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
-    glutInitWindowSize(W, H); glutInitWindowPosition(60, 40)
-    glutCreateWindow(b"BD Map: Sword->Gun Upgrade - 10 RABs, Slow Creep + Step Hop (Bigger)")
-    glEnable(GL_DEPTH_TEST); glClearColor(0.04, 0.06, 0.09, 1.0)
-    _q = gluNewQuadric()
-
-    glutDisplayFunc(display)
-    glutKeyboardFunc(key_normal)
-    glutSpecialFunc(key_special)
-    glutMouseFunc(mouse)
-    glutMainLoop()
-
-if __name__ == "__main__":
-    from OpenGL.GLUT import GLUT_BITMAP_HELVETICA_18
-    main()
-
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import *
+import atexit, math, random, sys, time
+import numpy as np
+from bd_map import load_map
+from bd_sim import (World, IN_FIRE, IN_VIEW, WEAPON_GUN, WEAPON_SWORD, GUN_BULLET_RADIUS, HAS_R_BODY, HAS_R_HEAD,
+                    RAB_R, SWING_TIME, fwd, rightv)
+from bd_mesh import Mesh, sphere_mesh, cone_mesh, cube_mesh, translate, rotate, instances, perspective, look_at
+from bd_hud import GlyphAtlas, HudText
+from bd_profile import profiler
+from bd_replay import Recorder, Replay, digest
+from bd_render import Scene, make_renderer
+from bd_net import NetClient, parse_addr
+from bd_fbo import Framebuffer, ResolutionScaler
+from bd_capture import FrameCapture, make_sink
+
+W, H = 1300, 980
+ASPECT, FOVY = W / H, 65.0
+tp_orbit_deg = 36.0
+tp_height = 720.0
+tp_radius = 1180.0
+
+EYE_Z = 148.0
+FP_EYE_PUSH = 16.0
+FP_EYE_UP   = 10.0
+
+world = None
+renderer = None                   # bd_render backend, picked by --renderer (see init_gl)
+RENDERER = "auto"
+_hud_text = None
+
+# —— profiler overlay ('p' toggles recording + overlay; frames are dumped at exit)
+PROFILE_DUMP = "hasina_profile"   # writes <name>.csv and <name>.json
+PROFILE_REFRESH = 30              # overlay percentiles are recomputed every N frames
+_prof_text = None
+_prof_items = []
+_prof_frame = 0
+
+# —— fixed-timestep simulation, interpolated rendering, timer-paced frames
+TICK_HZ = 60
+TICK_DT = 1.0 / TICK_HZ
+MAX_FRAME_DT = 0.25     # after a stall, drop time instead of running a burst of catch-up ticks
+TARGET_FPS = 60         # 0: redraw as soon as a frame is done and let vsync pace the swaps
+_acc = 0.0
+_alpha = 1.0            # how far the current frame is between the previous and the latest tick
+_pose = (0.0, 0.0, 0.0) # interpolated player (x, y, yaw) for this frame
+_inputs = []                      # presses (fire, view, reset) queued for the next tick
+_held = set()                     # movement and camera keys down right now, from the down/up callbacks
+_tapped = set()                   # ... and any pressed since the last tick, so a tap shorter than a tick counts
+_recorder = None                  # --record PATH: Recorder logging every tick's inputs
+_replay = None                    # --replay PATH: Replay supplying them instead of the keyboard
+_replay_reported = False
+_client = None                    # --connect HOST:PORT: NetClient; the server steps the world, we predict
+_next_frame = 0.0
+_timer_pending = False
+
+# —— dynamic resolution (--frame-budget MS): the scene renders into an FBO sized to hold the budget,
+#    then is stretched over the window; the HUD is drawn at full resolution on top
+FRAME_BUDGET_MS = 0.0             # 0: render straight to the window
+_scaler = None
+_fbo = None
+_lod_h = H                        # pixel height LOD is judged at: the internal render height
+
+# —— capture (--capture OUT): frames render into the capture FBO, are read back asynchronously and then
+#    shown; the simulation advances exactly 1/CAPTURE_FPS per frame, so nothing is skipped however slow
+CAPTURE_OUT = None
+CAPTURE_FPS = 60.0
+_capture = None
+
+# —— level of detail: (sphere slices, sphere stacks, cone slices) per level, picked by on-screen radius
+LOD_LEVELS = [(24, 24, 16), (14, 12, 10), (8, 6, 6), (5, 4, 4)]
+BULLET_LOD = [(12, 12), (8, 8), (6, 4), (4, 3)]
+LOD_PIXELS = (48.0, 16.0, 5.0)   # min projected radius in pixels for levels 0, 1, 2
+
+_eye = (0.0, 0.0, 0.0)
+
+def lod_many(xs, ys, z, r):
+    """LOD level per object from its bounding radius r projected at its distance from the eye."""
+    ex, ey, ez = _eye
+    dist = np.sqrt((np.asarray(xs) - ex)**2 + (np.asarray(ys) - ey)**2 + (z - ez)**2) + 1e-6
+    px = r * (0.5*_lod_h / math.tan(math.radians(FOVY*0.5))) / dist
+    return (px < LOD_PIXELS[0]).astype(int) + (px < LOD_PIXELS[1]) + (px < LOD_PIXELS[2])
+
+def lod_for(x, y, z, r): return int(lod_many([x], [y], z, r)[0])
+
+# —— view-frustum culling against bounding spheres; culled_objects counts skips in the last frame
+Z_NEAR, Z_FAR = 0.3, 9000.0
+_frustum = None
+culled_objects = 0
+
+def set_frustum(eye, target):
+    """Camera basis and half-angle slopes matching gluPerspective(FOVY, ASPECT) + gluLookAt(eye, target, +Z)."""
+    global _frustum
+    e = np.array(eye, float)
+    f = np.array(target, float) - e; f /= np.linalg.norm(f)
+    r = np.cross(f, (0.0, 0.0, 1.0)); r /= np.linalg.norm(r)
+    u = np.cross(r, f)
+    tv = math.tan(math.radians(FOVY*0.5)); th = tv*ASPECT
+    _frustum = (e, f, r, u, tv, th, math.sqrt(1 + tv*tv), math.sqrt(1 + th*th))
+
+def in_frustum_many(xs, ys, zs, r):
+    """Bool mask of spheres (xs, ys, zs, radius r) at least partly inside the view frustum."""
+    e, f, rt, u, tv, th, sv, sh = _frustum
+    dx = np.asarray(xs) - e[0]; dy = np.asarray(ys) - e[1]; dz = np.asarray(zs) - e[2]
+    cz = dx*f[0] + dy*f[1] + dz*f[2]
+    cx = dx*rt[0] + dy*rt[1] + dz*rt[2]
+    cy = dx*u[0] + dy*u[1] + dz*u[2]
+    return ((cz > Z_NEAR - r) & (cz < Z_FAR + r)
+            & (np.abs(cx) <= cz*th + r*sh) & (np.abs(cy) <= cz*tv + r*sv))
+
+def visible(x, y, z, r):
+    global culled_objects
+    if in_frustum_many(x, y, z, r): return True
+    culled_objects += 1
+    return False
+
+def cull_many(xs, ys, zs, r):
+    global culled_objects
+    m = in_frustum_many(xs, ys, zs, r)
+    culled_objects += len(m) - int(np.count_nonzero(m))
+    return m
+
+# —— models: parts tables (see bd_render) compiled by the renderer once, drawn by name
+CUBE = "cube"
+def _box(sx, sy, sz, rgb, *ops): return (CUBE, (1.0,), rgb, list(ops) + [("s", sx, sy, sz)])
+
+def _pistol(k):
+    """Pistol at local origin (facing +Y): slide, barrel, grip; k=0 first-person size, 1 in hand/on pickup."""
+    (s1, t1), (s2, t2), (s3, t3) = [((8, 42, 10), 26), ((6, 10, 8), 44), ((10, 22, 8), (-8, 16, -2))] if k == 0 else \
+                                   [((14, 52, 16), 30), ((10, 14, 12), 58), ((16, 28, 12), (-10, 22, -2))]
+    return [_box(*s1, (0.2, 0.2, 0.22), ("t", 0, t1, 0)), _box(*s2, (0.35, 0.35, 0.4), ("t", 0, t2, 0)),
+            _box(*s3, (0.1, 0.1, 0.12), ("t", *t3), ("r", -24, 0, 0, 1))]
+
+def rab_mesh(slices, stacks, cone_slices):
+    """The rab model (body, head, two horns) as one Mesh, so the horde draws in a single batch."""
+    horn = cone_mesh(6.0, 18, cone_slices, (0.35, 0.08, 0.08))
+    return Mesh.merge(sphere_mesh(RAB_R, slices, stacks, (0, 0, 0)).moved(dz=RAB_R),
+                      sphere_mesh(RAB_R*0.7, slices, stacks, (0, 0, 0)).moved(dz=RAB_R*2 + 5),
+                      horn.moved(-12, 8, RAB_R*2 + 22, rot_x_deg=-18),
+                      horn.moved( 12, 8, RAB_R*2 + 22, rot_x_deg=-18))
+
+def models():
+    """Every model the scene can submit; the map's ground comes from world.map, so build after the world."""
+    sl, st, cs = LOD_LEVELS[0]
+    m = {
+        "map": [("tris", world.map.sampler.tris, (0.14, 0.55, 0.26), [])],
+        "player": [_box(60, 34, 138, (0.2, 0.95, 0.95), ("t", 0, 0, 70)),
+                   ("disk", (20.0, 26.0, 28), (1.0, 0.85, 0.2), [("t", 0, 0, 168)]),
+                   ("sphere", (28.0, sl, st), (0.1, 0.3, 0.95), [("t", 0, 0, 168)]),
+                   ("cone", (10.0, 30.0, cs), (1, 1, 1), [("t", 0, 0, 228)])],
+        "pistol": _pistol(1), "pistol_fp": _pistol(0),
+        "sword_fp": [_box(7, 92, 7, (0.85, 0.85, 0.95))],
+        "sword_tp": [_box(14, 112, 14, (0.85, 0.85, 0.95))],
+        "sword_pickup": [_box(30, 30, 12, (0.1, 0.9, 0.3)), _box(9, 160, 9, (0.95, 0.95, 1.0))],
+        "ammo_pickup": [_box(34, 34, 16, (0.2, 1.0, 0.4))],
+        "gun_pickup_base": [_box(26, 26, 12, (0.15, 0.6, 0.95))],
+        "particle": cube_mesh(1.0, (1, 1, 1)),
+    }
+    for lv, (sl, st, cs) in enumerate(LOD_LEVELS):
+        m[f"hasina{lv}"] = [("sphere", (HAS_R_BODY, sl, st), (1, 1, 1), [("t", 0, 0, HAS_R_BODY)]),
+                            ("sphere", (HAS_R_HEAD, sl, st), (1, 1, 1), [("t", 0, 0, HAS_R_BODY*2 + 6)])]
+        m[f"bullet{lv}"] = [("solid_sphere", (GUN_BULLET_RADIUS, *BULLET_LOD[lv]), (1.0, 0.9, 0.2), [])]
+        m[f"rab{lv}"] = rab_mesh(sl, st, cs)
+    return m
+
+# —— scene: every per-frame transform computed here in NumPy, then handed to the renderer in one go
+_yaw = lambda deg: rotate(deg, 0, 0, 1)
+
+def scene_sword(scene):
+    """Sword – TP on hand; FP overlay near camera. Hidden if broken & not swinging."""
+    should_draw = (world.weapon == WEAPON_SWORD) and (world.swing_active or (world.sword_uses > 0))
+    if not should_draw: return
+    ang = 0.0
+    if world.swing_active:
+        t = (world.clock() - (1.0 - _alpha)*TICK_DT - world.swing_t0) / SWING_TIME
+        ang = -60 + 120*min(max(t,0.0),1.0)
+
+    px, py, yaw_deg = _pose
+    if world.first_person:
+        fx, fy = fwd(yaw_deg); rx, ry = rightv(yaw_deg)
+        gx = px + (FP_EYE_PUSH+12)*fx + 24*rx
+        gy = py + (FP_EYE_PUSH+12)*fy + 24*ry
+        scene.add("sword_fp", [translate(gx, gy, EYE_Z + FP_EYE_UP) @ _yaw(yaw_deg) @ _yaw(ang)])
+    else:
+        scene.add("sword_tp", [translate(px, py, 0) @ _yaw(yaw_deg) @ translate(0, 62, 124) @ _yaw(ang)])
+
+def scene_gun(scene):
+    """Tiny pistol: FP overlay or TP in hand."""
+    if world.weapon != WEAPON_GUN: return
+    px, py, yaw_deg = _pose
+    if world.first_person:
+        fx, fy = fwd(yaw_deg); rx, ry = rightv(yaw_deg)
+        gx = px + (FP_EYE_PUSH+12)*fx + 18*rx
+        gy = py + (FP_EYE_PUSH+12)*fy + 18*ry
+        scene.add("pistol_fp", [translate(gx, gy, EYE_Z + FP_EYE_UP) @ _yaw(yaw_deg)])
+    else:
+        scene.add("pistol", [translate(px, py, 0) @ _yaw(yaw_deg) @ translate(0, 62, 124)])
+
+def scene_particles(scene):
+    """Every live particle as a scaled, spun, tinted cube."""
+    pt = world.particles
+    if not pt: return
+    xs, ys, zs = pt.lerp("x", _alpha), pt.lerp("y", _alpha), pt.lerp("z", _alpha)
+    m = cull_many(xs, ys, zs, 15.0)
+    if not m.any(): return
+    k = pt.scale(world.clock() - (1.0 - _alpha)*TICK_DT)[m][:, None]
+    scales = np.stack([pt.sx[m], pt.sy[m], pt.sz[m]], -1)*k
+    rgb = np.stack([pt.r[m], pt.g[m], pt.b[m]], -1)
+    scene.add("particle", instances(xs[m], ys[m], zs[m], pt.lerp("rot", _alpha)[m], scales), rgb)
+
+def scene_rabs(scene):
+    xs, ys = world.rabs.lerp("x", _alpha), world.rabs.lerp("y", _alpha)
+    m = cull_many(xs, ys, RAB_R*1.5, RAB_R*1.6)
+    xs, ys = xs[m], ys[m]
+    lod = lod_many(xs, ys, RAB_R*1.5, RAB_R*1.6)
+    for lv in range(len(LOD_LEVELS)):
+        m = lod == lv
+        if m.any(): scene.add(f"rab{lv}", instances(xs[m], ys[m]))
+
+def scene_hasina(scene):
+    if world.win: return
+    hx, hy = world.lerp_hasina(_alpha)
+    if not visible(hx, hy, HAS_R_BODY*1.4, HAS_R_BODY*1.5): return
+    lv = lod_for(hx, hy, HAS_R_BODY*1.4, HAS_R_BODY*1.5)
+    scene.add(f"hasina{lv}", [translate(hx, hy, 0)])
+
+def scene_bullets(scene):
+    b = world.bullets
+    if not b: return
+    xs, ys = b.lerp("x", _alpha), b.lerp("y", _alpha)
+    m = cull_many(xs, ys, b.z, GUN_BULLET_RADIUS)
+    xs, ys, zs = xs[m], ys[m], b.z[m]
+    lod = lod_many(xs, ys, zs, GUN_BULLET_RADIUS)
+    for lv in range(len(BULLET_LOD)):
+        m = lod == lv
+        if m.any(): scene.add(f"bullet{lv}", instances(xs[m], ys[m], zs[m]))
+
+def scene_pickups(scene):
+    t = world.clock()
+    p = world.sword_pick
+    if p is not None and visible(p["x"], p["y"], 20.0, 85.0):
+        scene.add("sword_pickup", [translate(p["x"], p["y"], 20.0) @ _yaw((t*90.0)%360.0)])
+    p = world.gun_pick
+    if p is not None and visible(p["x"], p["y"], 26.0, 70.0):
+        base = translate(p["x"], p["y"], 26.0)
+        scene.add("gun_pickup_base", [base])
+        scene.add("pistol", [base @ _yaw((t*60.0)%360.0)])
+    p = world.ammo_pick
+    if p is not None and visible(p["x"], p["y"], 22.0, 30.0):
+        scene.add("ammo_pickup", [translate(p["x"], p["y"], 22.0) @ _yaw((t*120.0)%360.0)])
+
+def setup_camera():
+    """Projection and view matrices for this frame; also updates the LOD eye and the culling frustum."""
+    global _eye
+    px, py, yaw_deg = _pose
+    fx, fy = fwd(yaw_deg)
+    if world.first_person:
+        eye = (px + FP_EYE_PUSH*fx, py + FP_EYE_PUSH*fy, EYE_Z + FP_EYE_UP)
+        target = (eye[0] + 60*fx, eye[1] + 60*fy, eye[2])
+    else:
+        ang = math.radians(tp_orbit_deg)
+        eye = (px + tp_radius*math.cos(ang), py + tp_radius*math.sin(ang), tp_height)
+        target = (px, py, 60)
+    _eye = eye
+    set_frustum(eye, target)
+    return perspective(FOVY, ASPECT, Z_NEAR, Z_FAR), look_at(eye, target)
+
+def build_scene():
+    scene = Scene(*setup_camera())
+    scene.add("map", [np.eye(4)])
+    scene_pickups(scene)
+    scene_rabs(scene)
+    scene_hasina(scene)
+    if not world.first_person:
+        px, py, yaw_deg = _pose
+        scene.add("player", [translate(px, py, 0) @ _yaw(yaw_deg)])
+    scene_sword(scene)
+    scene_gun(scene)
+    scene_bullets(scene)
+    scene_particles(scene)
+    return scene
+
+def retune_camera_for_map():
+    global tp_radius, tp_height
+    tp_radius = world.map.radius * 2.3
+    tp_height = world.map.radius * 1.12
+
+def finish_capture():
+    """Flush and close the capture while the GL context still exists (freeglut tears it down on leaving the loop)."""
+    global _capture
+    if _capture is None: return
+    _capture.close()
+    print(f"captured {_capture.frames} frames, encoder stalls {_capture.stalls}")
+    if hasattr(_capture.sink, "ffmpeg_cmd"): print(_capture.sink.ffmpeg_cmd)
+    _capture = None
+
+def quit_game():
+    finish_capture()
+    glutLeaveMainLoop()
+
+def reset_world():
+    global tp_orbit_deg
+    _inputs.append(b'r')             # the world resets inside the next tick, so recordings see it
+    tp_orbit_deg = 36.0
+    retune_camera_for_map()
+
+# —— keyboard: movement and camera keys are polled once per tick from _held, not taken per key repeat
+MOVE_KEYS = (b'w', b's', b'a', b'd')
+ORBIT_SPEED, HEIGHT_SPEED = 60.0, 540.0      # deg/s and units/s while an arrow key is held
+
+def key_normal(k, *_):
+    k = k.lower()
+    if k == b'\x1b': quit_game(); return
+    if k == b'r': reset_world(); return
+    if k == b'p': profiler.enabled = not profiler.enabled; return
+    if k in MOVE_KEYS: _held.add(k); _tapped.add(k)
+
+def key_normal_up(k, *_): _held.discard(k.lower())
+
+def key_special(k, *_): _held.add(k); _tapped.add(k)
+def key_special_up(k, *_): _held.discard(k)
+
+def camera_tick(dt):
+    """Orbit and raise the third-person camera for the arrow keys down during this tick."""
+    global tp_orbit_deg, tp_height
+    down = _held | _tapped
+    if world.first_person: return
+    if GLUT_KEY_LEFT in down:  tp_orbit_deg -= ORBIT_SPEED*dt
+    if GLUT_KEY_RIGHT in down: tp_orbit_deg += ORBIT_SPEED*dt
+    if GLUT_KEY_UP in down:    tp_height += HEIGHT_SPEED*dt
+    if GLUT_KEY_DOWN in down:  tp_height = max(80.0, tp_height - HEIGHT_SPEED*dt)
+
+def mouse(btn, state, *_):
+    if btn == GLUT_LEFT_BUTTON  and state == GLUT_DOWN: _inputs.append(IN_FIRE)
+    if btn == GLUT_RIGHT_BUTTON and state == GLUT_DOWN: _inputs.append(IN_VIEW)
+
+def tick_inputs():
+    """This tick's inputs: the replay's, or the queued presses plus the movement keys down (logged when recording)."""
+    camera_tick(TICK_DT)
+    down = _held | _tapped
+    _tapped.clear()
+    if _replay is not None:
+        _inputs.clear()
+        return _replay.next()
+    ks = tuple(_inputs) + tuple(k for k in MOVE_KEYS if k in down); _inputs.clear()
+    if _recorder is not None: _recorder.tick(ks)
+    return ks
+
+def hud():
+    w = world
+    items = []
+    def text(x, y, s, rgb=(1,1,1)): items.append((x, y, s, rgb))
+    mode = "FIRST PERSON" if w.first_person else "THIRD PERSON"
+    if w.weapon == WEAPON_SWORD:
+        text(16, H-40, f"Sword uses: {w.sword_uses}   Kills: {w.rab_kills_for_upgrade}   Lives: {w.lives}")
+    else:
+        text(16, H-40, f"Ammo: {w.ammo}   Kills: {w.rab_kills_for_upgrade}   Lives: {w.lives}")
+    text(W-240, H-40, mode, (0.9,0.95,1))
+    if w.gun_pick is not None:
+        text(16, 20, "UPGRADE READY → Pick up the GUN!", (1.0,0.9,0.4))
+    elif w.sword_pick is not None:
+        text(16, 20, "New sword spawned: pick it up (+5)", (0.6,1,0.7))
+    elif w.ammo_pick is not None:
+        text(16, 20, "Ammo pack spawned: +5 bullets", (0.6,1,0.7))
+    if w.game_over:
+        text(W//2-60, H//2+12, "GAME OVER", (1,0.4,0.4))
+        text(W//2-150, H//2-12, "Press R to restart", (1,0.8,0.8))
+    if w.win:
+        text(W//2-40, H//2+12, "YOU WIN!", (1,1,0.2))
+        text(W//2-150, H//2-12, "Press R to restart", (1,1,0.7))
+    renderer.draw_text(_hud_text, items, W, H)
+
+def _on_frame_timer(_):
+    global _timer_pending
+    _timer_pending = False
+    glutPostRedisplay()
+
+def schedule_next_frame():
+    """Ask for the next display() at the TARGET_FPS deadline instead of spinning on glutPostRedisplay."""
+    global _next_frame, _timer_pending
+    if TARGET_FPS <= 0: glutPostRedisplay(); return
+    if _timer_pending: return
+    now = time.perf_counter()
+    _next_frame = max(_next_frame + 1.0/TARGET_FPS, now)
+    _timer_pending = True
+    glutTimerFunc(int((_next_frame - now)*1000.0), _on_frame_timer, 0)
+
+def advance_simulation():
+    """Run as many fixed TICK_DT steps as real time allows; queued presses go into the first one,
+    held keys into every one."""
+    global _tprev, _acc, _alpha, _pose
+    t = time.perf_counter(); _acc += 1.0/CAPTURE_FPS if _capture else min(t - _tprev, MAX_FRAME_DT); _tprev = t
+    while _acc >= TICK_DT:
+        if _client is not None: _client.tick(tick_inputs())
+        else: world.step(TICK_DT, tick_inputs())
+        _acc -= TICK_DT
+        if _replay is not None and _replay.done and not _replay_reported: finish_replay()
+    _alpha = _acc / TICK_DT
+    _pose = world.lerp_player(_alpha)
+
+def finish_replay():
+    """Print the digest of the state the replay ended in, once, after its last tick has run."""
+    global _replay_reported
+    _replay_reported = True
+    print(f"replay finished, digest {digest(world)}")
+
+def profile_overlay():
+    global _prof_items, _prof_frame
+    if _prof_frame % PROFILE_REFRESH == 0:
+        st = profiler.stats()
+        _prof_items = [(16, H-80, f"{'phase':<22}  p50 ms   p99 ms", (1.0,1.0,0.6))]
+        for k, name in enumerate(st):
+            p50, p99, _ = st[name]
+            _prof_items.append((16, H-104-20*k, f"{name:<22} {p50:7.2f}  {p99:7.2f}", (1.0,1.0,0.8)))
+        _prof_items.append((16, H-104-20*len(st), f"culled: {culled_objects}   draw calls: {renderer.draw_calls}"
+                            f"   render {_lod_h*W//H}x{_lod_h}", (1.0,1.0,0.8)))
+    _prof_frame += 1
+    renderer.draw_text(_prof_text, _prof_items, W, H)
+
+def dump_profile():
+    if not profiler.frames: return
+    profiler.dump_csv(PROFILE_DUMP + ".csv")
+    profiler.dump_json(PROFILE_DUMP + ".json")
+
+_tprev = time.perf_counter()
+def display():
+    global culled_objects, _lod_h
+    prof = profiler
+    t0 = time.perf_counter()
+    with prof.scope("sim"): advance_simulation()
+
+    culled_objects = 0
+    target = _capture.fb.fbo if _capture else 0
+    if _scaler is not None:
+        iw, ih = _scaler.size(W, H); _lod_h = ih
+        _fbo.resize(iw, ih); _fbo.bind()
+    elif _capture:
+        _capture.fb.bind()
+    with prof.scope("scene"): scene = build_scene()
+    with prof.scope("draw"):
+        if _scaler is None: renderer.draw(scene, W, H)
+        else: renderer.draw(scene, iw, ih); _fbo.blit(W, H, target)
+    with prof.scope("draw.hud"): hud()
+    if prof.enabled: profile_overlay()
+    if _capture:
+        with prof.scope("capture"): _capture.grab(); _capture.fb.blit(W, H)
+        if _replay is not None and _replay.done: quit_game()
+    if _scaler is not None:
+        with prof.scope("finish"): glFinish()          # so the frame's cost is measured before the swap's vsync wait
+        _scaler.update((time.perf_counter() - t0)*1000.0)
+
+    with prof.scope("swap"): glutSwapBuffers()
+    prof.end_frame()
+    schedule_next_frame()
+
+def reshape(w, h):
+    global W, H, ASPECT, _lod_h
+    if _capture and (w, h) != (W, H): glutReshapeWindow(W, H); return     # captured frames keep one size
+    W, H = max(w, 1), max(h, 1)
+    ASPECT = W / H
+    if _scaler is None: _lod_h = H
+
+def init_gl():
+    """Create the GLUT window and everything that needs its GL context."""
+    global renderer, _hud_text, _prof_text, _scaler, _fbo, _capture, TARGET_FPS
+    glutInit(); glutInitDisplayMode(GLUT_DOUBLE | GLUT_RGB | GLUT_DEPTH)
+    glutInitWindowSize(W, H); glutInitWindowPosition(60, 40)
+    glutCreateWindow(b"BD Map: Sword->Gun Upgrade - 10 RABs, Slow Creep + Step Hop (Bigger)")
+    glEnable(GL_DEPTH_TEST); glClearColor(0.04, 0.06, 0.09, 1.0)
+    renderer = make_renderer(RENDERER, models())
+    if FRAME_BUDGET_MS > 0:
+        _scaler = ResolutionScaler(FRAME_BUDGET_MS); _fbo = Framebuffer(W, H)
+    if CAPTURE_OUT:
+        _capture = FrameCapture(W, H, make_sink(CAPTURE_OUT, W, H, CAPTURE_FPS))
+        glutCloseFunc(finish_capture)
+        TARGET_FPS = 0
+    atlas = GlyphAtlas()
+    _hud_text = HudText(atlas); _prof_text = HudText(atlas)
+
+def main(argv=()):
+    """HasinaSlayer.py [--map PATH] [--record PATH | --replay PATH | --connect HOST:PORT [--match N] [--spectate]]
+                      [--renderer auto|legacy|core] [--frame-budget MS] [--capture OUT [--capture-fps FPS]]"""
+    global world, _tprev, _recorder, _replay, _client, TICK_DT, RENDERER, FRAME_BUDGET_MS, CAPTURE_OUT, CAPTURE_FPS
+    argv = list(argv)
+    if "--renderer" in argv: RENDERER = argv[argv.index("--renderer") + 1]
+    if "--frame-budget" in argv: FRAME_BUDGET_MS = float(argv[argv.index("--frame-budget") + 1])
+    if "--capture" in argv: CAPTURE_OUT = argv[argv.index("--capture") + 1]
+    if "--capture-fps" in argv: CAPTURE_FPS = float(argv[argv.index("--capture-fps") + 1])
+    game_map = load_map(argv[argv.index("--map") + 1]) if "--map" in argv else None
+    if "--replay" in argv:
+        _replay = Replay(argv[argv.index("--replay") + 1])
+        world = _replay.world(game_map); TICK_DT = _replay.tick_dt
+    elif "--connect" in argv:
+        match = int(argv[argv.index("--match") + 1]) if "--match" in argv else 0
+        _client = NetClient(parse_addr(argv[argv.index("--connect") + 1]), match, "--spectate" in argv, game_map)
+        world = _client.connect().world; TICK_DT = _client.tick_dt
+        atexit.register(_client.close)
+    else:
+        seed = random.randrange(2**63)
+        world = World(seed, game_map=game_map)
+        if "--record" in argv:
+            _recorder = Recorder(argv[argv.index("--record") + 1], seed, TICK_DT, game_map)
+            atexit.register(_recorder.close)
+    retune_camera_for_map()
+
+    init_gl()
+    atexit.register(dump_profile)
+
+    glutDisplayFunc(display)
+    glutReshapeFunc(reshape)
+    glutIgnoreKeyRepeat(1)
+    glutKeyboardFunc(key_normal); glutKeyboardUpFunc(key_normal_up)
+    glutSpecialFunc(key_special); glutSpecialUpFunc(key_special_up)
+    glutMouseFunc(mouse)
+    _tprev = time.perf_counter()
+    glutMainLoop()
+
+if __name__ == "__main__":
+    from OpenGL.GLUT import GLUT_BITMAP_HELVETICA_18
+    main(sys.argv[1:])
@@ -0,0 +1,181 @@
+"""Frame capture: render into an offscreen framebuffer, read back through a ring of pixel buffer
+objects and encode on a background thread, so neither readback nor encoding stalls the frame.
+
+In the game, `HasinaSlayer.py --capture frames/%05d.png` (or `out.rgb`) records the window with
+its HUD. Headless, this module replays a recording with no window at all (EGL, or OSMesa
+with --osmesa), as fast as the machine allows and one frame per tick:
+
+    python bd_capture.py session.bdr frames/%05d.png --size 1280x720
+    python bd_capture.py session.bdr out.rgb --fps 30     # raw rgb24; the ffmpeg line to wrap it is printed
+
+The headless path has no HUD, because the glyph atlas is built from GLUT bitmap fonts,
+which need a GLUT window.
+"""
+import os, sys
+if __name__ == "__main__":                       # the platform must be chosen before OpenGL is imported
+    os.environ.setdefault("PYOPENGL_PLATFORM", "osmesa" if "--osmesa" in sys.argv else "egl")
+import argparse, ctypes, queue, struct, threading, time, zlib
+from OpenGL.GL import *
+from OpenGL.raw.GL.VERSION.GL_1_0 import glReadPixels as _read_pixels_raw
+import numpy as np
+from bd_fbo import Framebuffer
+
+PBO_RING = 3                        # readbacks in flight; a frame is mapped PBO_RING - 1 frames after its read
+QUEUE_FRAMES = 8                    # frames waiting for the encoder before grab() blocks (it never drops)
+PNG_LEVEL = 1                       # zlib level: fast enough to keep up, still ~3-5x smaller than raw
+
+# —— sinks: write(rgb) takes top-down (h, w, 3) uint8 frames on the encoder thread
+class PngSink:
+    """One PNG per frame; pattern is a %-format path such as frames/%05d.png."""
+    def __init__(self, pattern, level=PNG_LEVEL):
+        self.pattern, self.level, self.n = pattern, level, 0
+        d = os.path.dirname(pattern % 0)
+        if d: os.makedirs(d, exist_ok=True)
+
+    def write(self, rgb):
+        h, w, _ = rgb.shape
+        rows = np.empty((h, 1 + 3*w), np.uint8); rows[:, 0] = 0; rows[:, 1:] = rgb.reshape(h, -1)
+        chunk = lambda tag, data: struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+        with open(self.pattern % self.n, "wb") as fh:
+            fh.write(b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+                     + chunk(b"IDAT", zlib.compress(rows.tobytes(), self.level)) + chunk(b"IEND", b""))
+        self.n += 1
+
+    def close(self): pass
+
+class RawSink:
+    """Raw rgb24 frames back to back in one file; ffmpeg_cmd is the line that wraps it in a video."""
+    def __init__(self, path, w, h, fps):
+        self.fh = open(path, "wb"); self.path = path
+        self.ffmpeg_cmd = f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {w}x{h} -r {fps:g} -i {path} out.mp4"
+
+    def write(self, rgb): self.fh.write(rgb.tobytes())
+
+    def close(self): self.fh.close()
+
+def make_sink(out, w, h, fps):
+    return PngSink(out) if "%" in out else RawSink(out, w, h, fps)
+
+class FrameCapture:
+    """Render target plus asynchronous readback. Draw into .fb, then call grab() once per frame.
+
+    grab() starts a glReadPixels into the next PBO of the ring, returning at once. It then maps
+    the PBO read PBO_RING - 1 frames ago, whose transfer has had that long to finish, and queues
+    the copy for the encoder thread. If the encoder falls behind, grab() waits for it instead
+    of dropping frames; `stalls` counts those waits.
+    """
+    def __init__(self, w, h, sink, ring=PBO_RING):
+        self.w, self.h, self.sink = w, h, sink
+        self.fb = Framebuffer(w, h)
+        self.size = w*h*4
+        self.pbos = list(glGenBuffers(ring))
+        for b in self.pbos:
+            glBindBuffer(GL_PIXEL_PACK_BUFFER, b); glBufferData(GL_PIXEL_PACK_BUFFER, self.size, None, GL_STREAM_READ)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.issued = 0; self.frames = 0; self.stalls = 0
+        self.q = queue.Queue(QUEUE_FRAMES)
+        self.error = None
+        self.thread = threading.Thread(target=self._encode, name="capture-encoder", daemon=True)
+        self.thread.start()
+
+    def _encode(self):
+        while True:
+            px = self.q.get()
+            if px is None: break
+            try: self.sink.write(np.ascontiguousarray(px[::-1, :, :3]))
+            except Exception as e: self.error = e; break
+
+    def _collect(self, i):
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.pbos[i % len(self.pbos)])
+        ptr = glMapBufferRange(GL_PIXEL_PACK_BUFFER, 0, self.size, GL_MAP_READ_BIT)
+        px = np.empty((self.h, self.w, 4), np.uint8)
+        ctypes.memmove(px.ctypes.data, ptr, self.size)
+        glUnmapBuffer(GL_PIXEL_PACK_BUFFER)
+        if self.error is not None: raise self.error
+        try: self.q.put_nowait(px)
+        except queue.Full: self.stalls += 1; self.q.put(px)
+        self.frames += 1
+
+    def grab(self):
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fb.fbo)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, self.pbos[self.issued % len(self.pbos)])
+        glPixelStorei(GL_PACK_ALIGNMENT, 4)
+        _read_pixels_raw(0, 0, self.w, self.h, GL_RGBA, GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        self.issued += 1
+        if self.issued >= len(self.pbos): self._collect(self.issued - len(self.pbos))
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+
+    def close(self):
+        """Collect the reads still in flight, let the encoder drain and close the sink."""
+        for i in range(max(0, self.issued - len(self.pbos) + 1), self.issued): self._collect(i)
+        glBindBuffer(GL_PIXEL_PACK_BUFFER, 0)
+        self.q.put(None); self.thread.join()
+        self.sink.close()
+        if self.error is not None: raise self.error
+
+# —— headless contexts: no window, the capture framebuffer is the only render target
+def egl_context():
+    from OpenGL import EGL
+    try:
+        from OpenGL.EGL.EXT.platform_base import eglGetPlatformDisplayEXT
+        dpy = eglGetPlatformDisplayEXT(0x31DD, None, None)          # EGL_PLATFORM_SURFACELESS_MESA
+    except Exception: dpy = EGL.EGL_NO_DISPLAY
+    if dpy == EGL.EGL_NO_DISPLAY: dpy = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+    major, minor = EGL.EGLint(), EGL.EGLint()
+    if not EGL.eglInitialize(dpy, ctypes.pointer(major), ctypes.pointer(minor)): raise RuntimeError("eglInitialize failed")
+    attrs = (EGL.EGLint*3)(EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT, EGL.EGL_NONE)
+    cfg, n = EGL.EGLConfig(), EGL.EGLint()
+    EGL.eglChooseConfig(dpy, attrs, ctypes.pointer(cfg), 1, ctypes.pointer(n))
+    EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+    ctx = EGL.eglCreateContext(dpy, cfg, EGL.EGL_NO_CONTEXT, (EGL.EGLint*1)(EGL.EGL_NONE))
+    if not EGL.eglMakeCurrent(dpy, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, ctx): raise RuntimeError("eglMakeCurrent failed")
+    return dpy, ctx
+
+def osmesa_context(w, h):
+    from OpenGL import osmesa, arrays
+    ctx = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+    buf = arrays.GLubyteArray.zeros((h, w, 4))
+    if not osmesa.OSMesaMakeCurrent(ctx, buf, GL_UNSIGNED_BYTE, w, h): raise RuntimeError("OSMesaMakeCurrent failed")
+    return ctx, buf
+
+def capture_replay(path, out, w, h, fps=None, game_map=None):
+    """Render every frame of recording `path` headless into sink `out`; returns (frames, seconds, stalls, sink)."""
+    import HasinaSlayer as game
+    from bd_render import CoreRenderer, LegacyRenderer, core_available, model_mesh
+    from bd_replay import Replay
+    rp = Replay(path)
+    every = max(1, round(1.0/(rp.tick_dt*fps))) if fps else 1
+    game.world = world = rp.world(game_map)
+    game.W, game.H, game.ASPECT = w, h, w/h
+    game._lod_h = h; game.retune_camera_for_map()
+    models = game.models()
+    renderer = CoreRenderer(models) if core_available() else LegacyRenderer({k: model_mesh(v) for k, v in models.items()})
+    glClearColor(0.04, 0.06, 0.09, 1.0)
+    cap = FrameCapture(w, h, make_sink(out, w, h, 1.0/(rp.tick_dt*every)))
+    t0 = time.perf_counter()
+    while not rp.done:
+        world.step(rp.tick_dt, rp.next())
+        if rp.t % every: continue
+        game._pose = world.lerp_player(1.0)
+        scene = game.build_scene()
+        cap.fb.bind()
+        renderer.draw(scene, w, h)
+        cap.grab()
+    cap.close()
+    return cap.frames, time.perf_counter() - t0, cap.stalls, cap.sink
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("replay"); ap.add_argument("out", help="%%-pattern for PNGs (frames/%%05d.png) or a raw .rgb path")
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--fps", type=float, default=None, help="default: one frame per recorded tick")
+    ap.add_argument("--map")
+    ap.add_argument("--osmesa", action="store_true", help="OSMesa instead of EGL")
+    a = ap.parse_args()
+    w, h = map(int, a.size.lower().split("x"))
+    if os.environ["PYOPENGL_PLATFORM"] == "osmesa": _keep = osmesa_context(w, h)
+    else: _keep = egl_context()
+    from bd_map import load_map
+    frames, el, stalls, sink = capture_replay(a.replay, a.out, w, h, a.fps, load_map(a.map) if a.map else None)
+    print(f"{frames} frames in {el:.2f}s ({frames/max(el, 1e-9):.1f} frames/s), encoder stalls {stalls}")
+    if hasattr(sink, "ffmpeg_cmd"): print(sink.ffmpeg_cmd)
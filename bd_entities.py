@@ -0,0 +1,64 @@
+import numpy as np
+
+class EntityPool:
+    """Struct-of-arrays entity storage: one float column per field, rows [0, n) are alive.
+
+    pool.x, pool.y, ... are views of the live rows, so vectorized code can read and
+    write them in place. compact(alive) drops every row whose mask entry is False in
+    one pass, keeping order.
+
+    Fields listed in `prev` also get an "<field>_prev" column holding the value at the
+    last save_prev(), so a renderer can lerp() between two simulation ticks.
+    """
+    def __init__(self, fields, capacity=64, prev=()):
+        self.prev = tuple(prev)
+        self.fields = tuple(fields) + tuple(f + "_prev" for f in self.prev)
+        self.n = 0
+        self._cols = {f: np.zeros(capacity) for f in self.fields}
+
+    def __len__(self): return self.n
+    def __bool__(self): return self.n > 0
+
+    def __getattr__(self, name):
+        cols = self.__dict__.get("_cols")
+        if cols is None or name not in cols: raise AttributeError(name)
+        return cols[name][:self.n]
+
+    def _reserve(self, n):
+        cap = len(self._cols[self.fields[0]])
+        if n <= cap: return
+        while cap < n: cap *= 2
+        for f, c in self._cols.items():
+            g = np.zeros(cap); g[:self.n] = c[:self.n]; self._cols[f] = g
+
+    def add(self, **vals):
+        i = self.n
+        self._reserve(i + 1)
+        for f, c in self._cols.items(): c[i] = vals.get(f, 0.0)
+        for f in self.prev: self._cols[f + "_prev"][i] = vals.get(f, 0.0)
+        self.n = i + 1
+        return i
+
+    def add_many(self, k, **cols):
+        """Append k rows; each keyword is a length-k array or a scalar broadcast to all of them."""
+        i = self.n
+        self._reserve(i + k)
+        for f, c in self._cols.items(): c[i:i+k] = cols.get(f, 0.0)
+        for f in self.prev: self._cols[f + "_prev"][i:i+k] = cols.get(f, 0.0)
+        self.n = i + k
+
+    def compact(self, alive):
+        k = int(np.count_nonzero(alive))
+        if k == self.n: return
+        for c in self._cols.values(): c[:k] = c[:self.n][alive]
+        self.n = k
+
+    def clear(self): self.n = 0
+
+    def save_prev(self):
+        for f in self.prev: self._cols[f + "_prev"][:self.n] = self._cols[f][:self.n]
+
+    def lerp(self, f, alpha):
+        """Field f blended from its save_prev() value (alpha 0) to the current one (alpha 1)."""
+        p = self._cols[f + "_prev"][:self.n]
+        return p + (self._cols[f][:self.n] - p)*alpha
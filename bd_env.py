@@ -0,0 +1,148 @@
+"""Gym-style environment over World for bots, and a process-pool runner for many episodes.
+
+    env = HasinaEnv(difficulty={"N_RABS": 30})
+    obs = env.reset(seed=1)
+    obs, reward, done, info = env.step(ACTIONS.index((b'w',)))
+
+    python bd_env.py --episodes 2000 --policy chase N_RABS=30 GUN_AMMO_INIT=3
+"""
+import argparse, multiprocessing as mp, os, random, time
+import numpy as np
+import bd_sim
+from bd_sim import World, IN_FIRE, LIVES, SWING_RANGE, WEAPON_GUN, fwd, rightv
+
+# —— difficulty: bd_sim tunables a World reads while it runs
+DIFFICULTY = ("N_RABS", "RAB_SLOW_SPEED", "STEP_PER_SWING_RAB", "STEP_PER_SHOT_RAB", "SWORD_SWINGS", "GUN_AMMO_INIT")
+_DEFAULTS = {k: getattr(bd_sim, k) for k in DIFFICULTY}
+
+def configure(**difficulty):
+    """Set the difficulty tunables for this process; names left out go back to their defaults.
+
+    They are bd_sim module globals, so one process plays one difficulty at a time; the pool
+    runner gives every episode its own configure() call.
+    """
+    for k in difficulty:
+        if k not in _DEFAULTS: raise KeyError(f"unknown difficulty setting {k!r}")
+    d = dict(difficulty)
+    if "STEP_PER_SWING_RAB" in d: d.setdefault("STEP_PER_SHOT_RAB", d["STEP_PER_SWING_RAB"])
+    for k, v in _DEFAULTS.items(): setattr(bd_sim, k, type(v)(d.get(k, v)))
+
+# —— environment
+ACTIONS = ((), (b'w',), (b's',), (b'a',), (b'd',), (IN_FIRE,), (b'w', b'a'), (b'w', b'd'))
+OBS_FIELDS = ("has_f", "has_r", "rab_f", "rab_r", "pick_f", "pick_r", "lives", "gun", "ammo", "sword_uses")
+R_KILL, R_LIFE, R_WIN, R_LOSE = 1.0, -5.0, 100.0, -100.0
+
+class HasinaEnv:
+    """reset(seed) -> obs; step(action) -> (obs, reward, done, info) with action an index into ACTIONS.
+
+    One step is one tick of tick_dt. Observations are float32 rows laid out as OBS_FIELDS,
+    positions given in the player's frame (forward, right): Hasina, the nearest rab and the
+    nearest pickup (zeros when there is none). An episode ends on a win, a game over or
+    after max_steps ticks.
+    """
+    def __init__(self, difficulty=None, tick_dt=1.0/60.0, max_steps=60*120):
+        self.difficulty = dict(difficulty or {})
+        self.tick_dt, self.max_steps = tick_dt, max_steps
+        self.world = None
+
+    def reset(self, seed=None):
+        configure(**self.difficulty)
+        self.world = World(seed)
+        self.steps = 0; self._kills = 0; self._lives = self.world.lives
+        return self.observe()
+
+    def _local(self, x, y):
+        w = self.world
+        fx, fy = fwd(w.yaw_deg); rx, ry = rightv(w.yaw_deg)
+        dx, dy = x - w.px, y - w.py
+        return dx*fx + dy*fy, dx*rx + dy*ry
+
+    def observe(self):
+        w = self.world
+        obs = np.zeros(len(OBS_FIELDS), np.float32)
+        obs[0:2] = self._local(w.has_x, w.has_y)
+        if w.rabs:
+            i = int(np.argmin((w.rabs.x - w.px)**2 + (w.rabs.y - w.py)**2))
+            obs[2:4] = self._local(w.rabs.x[i], w.rabs.y[i])
+        picks = [p for p in (w.sword_pick, w.gun_pick, w.ammo_pick) if p is not None]
+        if picks:
+            p = min(picks, key=lambda p: (p["x"] - w.px)**2 + (p["y"] - w.py)**2)
+            obs[4:6] = self._local(p["x"], p["y"])
+        obs[6:] = w.lives, w.weapon == WEAPON_GUN, w.ammo, w.sword_uses
+        return obs
+
+    def step(self, action):
+        w = self.world
+        w.step(self.tick_dt, ACTIONS[action])
+        self.steps += 1
+        kills, lost = w.rab_kills_for_upgrade - self._kills, self._lives - w.lives
+        self._kills, self._lives = w.rab_kills_for_upgrade, w.lives
+        reward = R_KILL*kills + R_LIFE*lost + R_WIN*w.win + R_LOSE*w.game_over
+        done = w.win or w.game_over or self.steps >= self.max_steps
+        info = {"win": w.win, "lives_lost": LIVES - w.lives, "steps": self.steps, "kills": w.rab_kills_for_upgrade}
+        return self.observe(), reward, done, info
+
+# —— policies: (obs, rng) -> action index
+def random_policy(obs, rng): return rng.randrange(len(ACTIONS))
+
+def _steer(f, r):
+    """Turn towards a target at (forward f, right r) and walk once it is roughly ahead."""
+    if abs(r) > 0.2*abs(f) or f < 0: return ACTIONS.index((b'd',) if r > 0 else (b'a',))
+    return ACTIONS.index((b'w',))
+
+def chase_policy(obs, rng):
+    """Walk to a pickup when out of swings/ammo, otherwise go for Hasina and attack once in reach."""
+    has_f, has_r, _, _, pick_f, pick_r, _, gun, ammo, swings = obs
+    armed = ammo > 0 if gun else swings > 0
+    if not armed and (pick_f or pick_r): return _steer(pick_f, pick_r)
+    ahead = has_f > 0 and abs(has_r) < 0.3*has_f
+    if armed and ahead and (gun or has_f < SWING_RANGE*0.9): return ACTIONS.index((IN_FIRE,))
+    return _steer(has_f, has_r)
+
+POLICIES = {"random": random_policy, "chase": chase_policy}
+
+# —— process-pool runner
+def play_episode(job):
+    """(policy name, difficulty, seed, max_steps) -> final info dict; top-level so a Pool can pickle it."""
+    policy, difficulty, seed, max_steps = job
+    env = HasinaEnv(difficulty, max_steps=max_steps)
+    obs = env.reset(seed); rng = random.Random(seed); pol = POLICIES[policy]
+    done = False
+    while not done: obs, _, done, info = env.step(pol(obs, rng))
+    return info
+
+def summarize(infos):
+    steps = np.array([i["steps"] for i in infos])
+    return {"episodes": len(infos),
+            "win_rate": float(np.mean([i["win"] for i in infos])),
+            "lives_lost": float(np.mean([i["lives_lost"] for i in infos])),
+            "episode_len_mean": float(steps.mean()), "episode_len_p50": float(np.median(steps)),
+            "kills": float(np.mean([i["kills"] for i in infos]))}
+
+def run_episodes(episodes, policy="chase", difficulty=None, max_steps=60*120, processes=None, seed=0):
+    """Play episodes seeded seed, seed+1, ... across a process pool (processes=1 runs in this process)."""
+    jobs = [(policy, dict(difficulty or {}), seed + i, max_steps) for i in range(episodes)]
+    procs = processes or os.cpu_count() or 1
+    if procs == 1: return summarize([play_episode(j) for j in jobs])
+    with mp.Pool(procs) as pool:
+        infos = pool.map(play_episode, jobs, chunksize=max(1, episodes // (8*procs)))
+    return summarize(infos)
+
+def _setting(s):
+    k, _, v = s.partition("=")
+    return k, float(v)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("settings", nargs="*", type=_setting, help=f"NAME=VALUE, NAME one of {', '.join(DIFFICULTY)}")
+    ap.add_argument("--episodes", type=int, default=200)
+    ap.add_argument("--policy", choices=sorted(POLICIES), default="chase")
+    ap.add_argument("--max-steps", type=int, default=60*120)
+    ap.add_argument("--processes", type=int, default=None, help="default: all cores")
+    ap.add_argument("--seed", type=int, default=0)
+    a = ap.parse_args()
+    t0 = time.perf_counter()
+    res = run_episodes(a.episodes, a.policy, dict(a.settings), a.max_steps, a.processes, a.seed)
+    el = time.perf_counter() - t0
+    for k, v in res.items(): print(f"{k:<17} {v:g}")
+    print(f"{a.episodes/el:.1f} episodes/s over {a.processes or os.cpu_count()} processes")
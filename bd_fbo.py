@@ -0,0 +1,69 @@
+"""Offscreen framebuffers, and a controller that sizes one to hold a frame-time budget."""
+import math
+from OpenGL.GL import *
+
+class Framebuffer:
+    """Colour + depth renderbuffers behind one FBO; resize() reallocates only when the size changes."""
+    def __init__(self, w, h):
+        self.fbo = glGenFramebuffers(1)
+        self.color, self.depth = glGenRenderbuffers(2)
+        self.w = self.h = 0
+        self.resize(w, h)
+
+    def resize(self, w, h):
+        w, h = max(int(w), 1), max(int(h), 1)
+        if (w, h) == (self.w, self.h): return
+        self.w, self.h = w, h
+        prev = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.color); glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, w, h)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, self.color)
+        glBindRenderbuffer(GL_RENDERBUFFER, self.depth); glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, w, h)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, self.depth)
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"framebuffer {w}x{h} incomplete")
+        glBindFramebuffer(GL_FRAMEBUFFER, prev)
+
+    def bind(self):
+        glBindFramebuffer(GL_FRAMEBUFFER, self.fbo)
+        glViewport(0, 0, self.w, self.h)
+
+    def blit(self, w, h, target=0):
+        """Stretch the colour buffer over a w x h target (the window by default), bilinear, and leave it bound."""
+        glBindFramebuffer(GL_READ_FRAMEBUFFER, self.fbo)
+        glBindFramebuffer(GL_DRAW_FRAMEBUFFER, target)
+        glBlitFramebuffer(0, 0, self.w, self.h, 0, 0, w, h, GL_COLOR_BUFFER_BIT,
+                          GL_NEAREST if (w, h) == (self.w, self.h) else GL_LINEAR)
+        glBindFramebuffer(GL_FRAMEBUFFER, target)
+        glViewport(0, 0, w, h)
+
+# —— dynamic resolution
+SCALE_STEP = 1.0/32                 # scales are multiples of this, so the FBO is not reallocated for noise
+SETTLE_FRAMES = 8                   # frames measured at a new scale before it may change again
+HEADROOM = 0.7                      # below this fraction of the budget, step back up
+
+class ResolutionScaler:
+    """Render scale (fraction of the window's width and height) for the next frame.
+
+    update() takes the last frame's work time. Over budget, the scale drops to where pixel cost
+    (~ scale^2) would land at 90% of the budget. Comfortably under it, the scale climbs one step
+    at a time. Each change waits SETTLE_FRAMES before the next, so it cannot oscillate every frame.
+    """
+    def __init__(self, budget_ms, min_scale=0.35, max_scale=1.0):
+        self.budget_ms, self.min_scale, self.max_scale = budget_ms, min_scale, max_scale
+        self.scale = max_scale
+        self.ema = None; self._settle = SETTLE_FRAMES
+
+    def size(self, w, h):
+        return max(1, int(round(w*self.scale))), max(1, int(round(h*self.scale)))
+
+    def update(self, frame_ms):
+        self.ema = frame_ms if self.ema is None else self.ema + 0.25*(frame_ms - self.ema)
+        if self._settle: self._settle -= 1; return self.scale
+        s = self.scale
+        if self.ema > self.budget_ms: s = min(s - SCALE_STEP, s*math.sqrt(0.9*self.budget_ms/self.ema))
+        elif self.ema < HEADROOM*self.budget_ms: s = s + SCALE_STEP
+        s = min(max(round(s/SCALE_STEP)*SCALE_STEP, self.min_scale), self.max_scale)
+        if s != self.scale:
+            self.scale = s; self.ema = None; self._settle = SETTLE_FRAMES
+        return self.scale
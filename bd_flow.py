@@ -0,0 +1,77 @@
+"""Grid flow field toward one target, shared by every pursuer: a direction lookup per mover instead of a path."""
+import math
+import numpy as np
+
+FLOW_CELL = 48.0
+FLOW_DIRECT_CELLS = 1.5             # within this many cells of the target, head straight at it
+_NBR = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+_COST = (1.0, 1.0, 1.0, 1.0, math.sqrt(2), math.sqrt(2), math.sqrt(2), math.sqrt(2))
+_UX = np.array([di/math.hypot(di, dj) for di, dj in _NBR])
+_UY = np.array([dj/math.hypot(di, dj) for di, dj in _NBR])
+
+class FlowField:
+    """Shortest-path distances to the target over the map's grid cells, and per-cell descent directions.
+
+    retarget() only recomputes when the target enters a new cell, or with retarget_cells > 1
+    once it is that many cells from the one the field was built for, by relaxing all cells in
+    lock-step until nothing changes. directions() is then a bilinear lookup for any number of
+    movers, so pursuit cost does not grow with them and concave coastlines are walked around.
+    """
+    def __init__(self, game_map, cell=FLOW_CELL, retarget_cells=1):
+        self.cell, self.retarget_cells = cell, retarget_cells
+        self.x0 = game_map.min_x - cell; self.y0 = game_map.min_y - cell
+        self.nx = int(math.ceil((game_map.max_x + cell - self.x0) / cell)) + 1
+        self.ny = int(math.ceil((game_map.max_y + cell - self.y0) / cell)) + 1
+        gx, gy = np.meshgrid(self.x0 + cell*np.arange(self.nx), self.y0 + cell*np.arange(self.ny))
+        self.free = game_map.sdf.distance(gx, gy) < 0.0
+        self.target = None
+        self.dist = np.full((self.ny, self.nx), np.inf)
+        self.u = np.zeros((self.ny, self.nx, 2))
+
+    def _cell(self, x, y):
+        i = min(max(int(round((x - self.x0) / self.cell)), 0), self.nx - 1)
+        j = min(max(int(round((y - self.y0) / self.cell)), 0), self.ny - 1)
+        return j, i
+
+    def retarget(self, x, y):
+        t = self._cell(x, y)
+        if self.target is not None and max(abs(t[0] - self.target[0]), abs(t[1] - self.target[1])) < self.retarget_cells:
+            return
+        self.target = t
+        ny, nx = self.ny, self.nx
+        free = self.free.copy(); free[t] = True          # the target may stand in a coast cell
+        dist = np.full((ny + 2, nx + 2), np.inf)
+        dist[t[0] + 1, t[1] + 1] = 0.0
+        core = dist[1:-1, 1:-1]
+        while True:
+            best = core.copy()
+            for (di, dj), c in zip(_NBR, _COST):
+                np.minimum(best, dist[1+dj:ny+1+dj, 1+di:nx+1+di] + c, out=best)
+            best[~free] = np.inf
+            if np.array_equal(best, core): break
+            core[:] = best
+        nb = np.stack([dist[1+dj:ny+1+dj, 1+di:nx+1+di] + c for (di, dj), c in zip(_NBR, _COST)])
+        k = nb.argmin(axis=0)
+        down = np.isfinite(core) & (core > 0.0)          # every reachable cell but the target's
+        self.dist = core.copy()
+        self.u = np.stack([np.where(down, _UX[k], 0.0), np.where(down, _UY[k], 0.0)], -1)
+
+    def directions(self, xs, ys, tx, ty):
+        """Unit step directions for movers at (xs, ys) chasing (tx, ty).
+
+        Cell directions are blended bilinearly; movers near the target, or where the field has no
+        answer (unreachable or off-grid), head straight at it as before.
+        """
+        self.retarget(tx, ty)
+        fx = np.clip((xs - self.x0) / self.cell, 0.0, self.nx - 1.000001)
+        fy = np.clip((ys - self.y0) / self.cell, 0.0, self.ny - 1.000001)
+        i = fx.astype(int); j = fy.astype(int); wx = (fx - i)[:, None]; wy = (fy - j)[:, None]
+        g = self.u
+        u = (g[j, i]*(1-wx) + g[j, i+1]*wx)*(1-wy) + (g[j+1, i]*(1-wx) + g[j+1, i+1]*wx)*wy
+        ux, uy = u[:, 0], u[:, 1]
+        n = np.hypot(ux, uy)
+        dx, dy = tx - xs, ty - ys
+        d = np.maximum(1e-6, np.hypot(dx, dy))
+        direct = (n < 0.1) | (d < FLOW_DIRECT_CELLS*self.cell)
+        n = np.maximum(n, 1e-9)
+        return np.where(direct, dx/d, ux/n), np.where(direct, dy/d, uy/n)
@@ -0,0 +1,113 @@
+"""HUD text through a glyph atlas: GLUT bitmap glyphs rasterised once, strings cached as quad batches."""
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import *
+import numpy as np
+
+class GlyphAtlas:
+    """One GLUT bitmap font rendered into an alpha texture; needs a current GL context."""
+    COLS = 16
+
+    def __init__(self, font=GLUT_BITMAP_HELVETICA_18, cell_h=24, descent=6, pad=3, first=32, last=126):
+        self.cell_h, self.descent, self.pad = cell_h, descent, pad
+        codes = range(first, last + 1)
+        self.advance = {c: glutBitmapWidth(font, c) for c in codes}
+        self.cell_w = max(self.advance.values()) + 2*pad
+        rows = (len(codes) + self.COLS - 1) // self.COLS
+        self.tex_w, self.tex_h = self.COLS*self.cell_w, rows*cell_h
+
+        prev_fbo = glGetIntegerv(GL_FRAMEBUFFER_BINDING)
+        fbo = glGenFramebuffers(1); rb = glGenRenderbuffers(1)
+        glBindFramebuffer(GL_FRAMEBUFFER, fbo)
+        glBindRenderbuffer(GL_RENDERBUFFER, rb)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, self.tex_w, self.tex_h)
+        glFramebufferRenderbuffer(GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, rb)
+        glPushAttrib(GL_VIEWPORT_BIT | GL_COLOR_BUFFER_BIT | GL_ENABLE_BIT | GL_CURRENT_BIT)
+        glViewport(0, 0, self.tex_w, self.tex_h); glDisable(GL_DEPTH_TEST)
+        glClearColor(0, 0, 0, 0); glClear(GL_COLOR_BUFFER_BIT)
+        glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity(); gluOrtho2D(0, self.tex_w, 0, self.tex_h)
+        glMatrixMode(GL_MODELVIEW); glPushMatrix(); glLoadIdentity()
+        glColor3f(1, 1, 1)
+        self.uv = {}
+        for k, c in enumerate(codes):
+            cx, cy = (k % self.COLS)*self.cell_w, (k // self.COLS)*cell_h
+            glRasterPos2i(cx + pad, cy + descent); glutBitmapCharacter(font, c)
+            self.uv[c] = (cx/self.tex_w, cy/self.tex_h, (cx + self.cell_w)/self.tex_w, (cy + cell_h)/self.tex_h)
+        self.alpha = alpha = glReadPixels(0, 0, self.tex_w, self.tex_h, GL_RED, GL_UNSIGNED_BYTE)
+        glPopMatrix(); glMatrixMode(GL_PROJECTION); glPopMatrix(); glMatrixMode(GL_MODELVIEW)
+        glPopAttrib()
+        glBindFramebuffer(GL_FRAMEBUFFER, prev_fbo)
+        glDeleteRenderbuffers(1, [rb]); glDeleteFramebuffers(1, [fbo])
+
+        self.tex = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D, self.tex)
+        glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexImage2D(GL_TEXTURE_2D, 0, GL_ALPHA8, self.tex_w, self.tex_h, 0, GL_ALPHA, GL_UNSIGNED_BYTE, alpha)
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def quads(self, x, y, s):
+        """(positions, texcoords) float32 arrays, 4 vertices per glyph, baseline at (x, y)."""
+        pos, uv = [], []
+        pen = x - self.pad; y0 = y - self.descent; y1 = y0 + self.cell_h
+        for ch in s:
+            c = ord(ch)
+            if c not in self.uv: continue           # glutBitmapCharacter draws nothing for these either
+            u0, v0, u1, v1 = self.uv[c]
+            x1 = pen + self.cell_w
+            pos += [(pen, y0), (x1, y0), (x1, y1), (pen, y1)]
+            uv += [(u0, v0), (u1, v0), (u1, v1), (u0, v1)]
+            pen += self.advance[c]
+        return np.array(pos, np.float32).reshape(-1, 2), np.array(uv, np.float32).reshape(-1, 2)
+
+class HudText:
+    """Draws a list of (x, y, text, rgb) in one ortho pass and one draw call.
+
+    Each string's quads are cached, and the combined vertex batch is rebuilt only when the
+    list differs from the previous frame's, i.e. when a counter or message actually changes.
+    """
+    MAX_CACHED = 256
+
+    def __init__(self, atlas):
+        self.atlas = atlas
+        self._strings = {}
+        self._key = None; self._arrays = None
+
+    def _string(self, x, y, s):
+        q = self._strings.get((x, y, s))
+        if q is None:
+            if len(self._strings) >= self.MAX_CACHED: self._strings.clear()
+            q = self._strings[(x, y, s)] = self.atlas.quads(x, y, s)
+        return q
+
+    def arrays(self, items):
+        """(positions, texcoords, colours) for all items, 4 vertices per glyph; None when empty."""
+        key = tuple(items)
+        if key != self._key:
+            pos, uv, col = [], [], []
+            for x, y, s, rgb in items:
+                p, t = self._string(x, y, s)
+                pos.append(p); uv.append(t); col.append(np.tile(np.array(rgb, np.float32), (len(p), 1)))
+            self._arrays = (np.concatenate(pos), np.concatenate(uv), np.concatenate(col)) if pos else None
+            if self._arrays is not None and not len(self._arrays[0]): self._arrays = None
+            self._key = key
+        return self._arrays
+
+    def draw(self, items, w, h):
+        arrays = self.arrays(items)
+        if arrays is None: return
+        pos, uv, col = arrays
+
+        glMatrixMode(GL_PROJECTION); glPushMatrix(); glLoadIdentity(); gluOrtho2D(0, w, 0, h)
+        glMatrixMode(GL_MODELVIEW); glPushMatrix(); glLoadIdentity()
+        glPushAttrib(GL_ENABLE_BIT | GL_COLOR_BUFFER_BIT | GL_TEXTURE_BIT)
+        glDisable(GL_DEPTH_TEST); glEnable(GL_BLEND); glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glEnable(GL_TEXTURE_2D); glBindTexture(GL_TEXTURE_2D, self.atlas.tex)
+        glTexEnvi(GL_TEXTURE_ENV, GL_TEXTURE_ENV_MODE, GL_MODULATE)
+        glEnableClientState(GL_VERTEX_ARRAY); glEnableClientState(GL_TEXTURE_COORD_ARRAY); glEnableClientState(GL_COLOR_ARRAY)
+        glVertexPointer(2, GL_FLOAT, 0, pos); glTexCoordPointer(2, GL_FLOAT, 0, uv); glColorPointer(3, GL_FLOAT, 0, col)
+        glDrawArrays(GL_QUADS, 0, len(pos))
+        glDisableClientState(GL_COLOR_ARRAY); glDisableClientState(GL_TEXTURE_COORD_ARRAY); glDisableClientState(GL_VERTEX_ARRAY)
+        glPopAttrib()
+        glPopMatrix(); glMatrixMode(GL_PROJECTION); glPopMatrix(); glMatrixMode(GL_MODELVIEW)
@@ -0,0 +1,400 @@
+import math, random
+import numpy as np
+
+BD_POLY_BASE = [
+    (-300,120),(-280,180),(-260,220),(-230,240),(-190,250),
+    (-150,220),(-110,240),(-70,200),(-35,230),(5,200),
+    (35,220),(70,185),(105,195),(140,150),(120,115),
+    (150,80),(120,20),(85,0),(45,-30),(10,-70),
+    (-35,-105),(-45,-150),(-110,-180),(-160,-160),(-200,-120),
+    (-242,-75),(-262,-25),(-280,35),(-295,90)
+]
+MAP_SCALE = 7.5
+BD_POLY = [(x*MAP_SCALE, y*MAP_SCALE) for (x,y) in BD_POLY_BASE]
+MAP_MIN_X = min(x for x,_ in BD_POLY); MAP_MAX_X = max(x for x,_ in BD_POLY)
+MAP_MIN_Y = min(y for _,y in BD_POLY); MAP_MAX_Y = max(y for _,y in BD_POLY)
+MAP_W = MAP_MAX_X - MAP_MIN_X; MAP_H = MAP_MAX_Y - MAP_MIN_Y
+MAP_RADIUS = 0.5*max(MAP_W, MAP_H)
+
+def point_in_poly(x, y, poly=BD_POLY):
+    inside = False
+    n = len(poly)
+    for i in range(n):
+        x1, y1 = poly[i]; x2, y2 = poly[(i+1) % n]
+        if ((y1 > y) != (y2 > y)) and (x < (x2-x1)*(y-y1)/(y2-y1+1e-9) + x1):
+            inside = not inside
+    return inside
+
+def poly_edges(poly):
+    """Edge arrays (x1, y1, y2, dx/dy) for points_in_poly(); build once per polygon."""
+    x1 = np.array([x for x,_ in poly], float); y1 = np.array([y for _,y in poly], float)
+    x2 = np.roll(x1, -1); y2 = np.roll(y1, -1)
+    return x1, y1, y2, (x2-x1)/(y2-y1+1e-9)
+
+BD_EDGES = poly_edges(BD_POLY)
+
+def points_in_poly(xs, ys, edges=BD_EDGES):
+    """Batched point_in_poly(): same ray cast for every (x, y) pair at once, returns a bool array."""
+    x1, y1, y2, k = edges
+    xs = np.asarray(xs, float)[..., None]; ys = np.asarray(ys, float)[..., None]
+    hit = ((y1 > ys) != (y2 > ys)) & (xs < k*(ys-y1) + x1)
+    return (np.count_nonzero(hit, axis=-1) & 1).astype(bool)
+
+# —— uniform sampling: ear-clipped triangles picked through an area-weighted alias table
+def _cross(a, b, c): return (b[0]-a[0])*(c[1]-a[1]) - (b[1]-a[1])*(c[0]-a[0])
+
+def _in_tri(p, a, b, c):
+    return _cross(a, b, p) >= 0 and _cross(b, c, p) >= 0 and _cross(c, a, p) >= 0
+
+def triangulate(poly):
+    """Ear clipping of a simple polygon; returns index triples, counter-clockwise."""
+    n = len(poly)
+    area2 = sum(poly[i][0]*poly[(i+1)%n][1] - poly[(i+1)%n][0]*poly[i][1] for i in range(n))
+    idx = list(range(n)) if area2 > 0 else list(range(n-1, -1, -1))
+    tris = []
+    while len(idx) > 3:
+        m = len(idx)
+        for k in range(m):
+            i0, i1, i2 = idx[k-1], idx[k], idx[(k+1) % m]
+            a, b, c = poly[i0], poly[i1], poly[i2]
+            if _cross(a, b, c) <= 0: continue
+            if any(_in_tri(poly[j], a, b, c) for j in idx if j not in (i0, i1, i2)): continue
+            tris.append((i0, i1, i2)); del idx[k]; break
+        else:
+            break
+    if len(idx) == 3: tris.append(tuple(idx))
+    return tris
+
+def alias_table(weights):
+    """Vose alias method: (prob, alias) so a weighted pick costs two uniforms."""
+    n = len(weights); total = float(sum(weights))
+    p = [w*n/total for w in weights]
+    prob = [1.0]*n; alias = list(range(n))
+    small = [i for i in range(n) if p[i] < 1.0]; large = [i for i in range(n) if p[i] >= 1.0]
+    while small and large:
+        s = small.pop(); l = large.pop()
+        prob[s] = p[s]; alias[s] = l
+        p[l] -= 1.0 - p[s]
+        (small if p[l] < 1.0 else large).append(l)
+    return prob, alias
+
+class PolySampler:
+    """Constant-time uniform points inside a region given as triangles ((ax, ay), (bx, by), (cx, cy))."""
+    def __init__(self, tris):
+        self.tris = [tuple(map(tuple, t)) for t in tris]
+        self.prob, self.alias = alias_table([0.5*abs(_cross(*t)) for t in self.tris])
+        A = np.array(self.tris, float)
+        self._a = A[:, 0]; self._ab = A[:, 1] - A[:, 0]; self._ac = A[:, 2] - A[:, 0]
+        self._prob = np.array(self.prob); self._alias = np.array(self.alias)
+
+    def sample(self, rng=random):
+        n = len(self.tris)
+        i = int(rng.random()*n)
+        if rng.random() >= self.prob[i]: i = self.alias[i]
+        (ax, ay), (bx, by), (cx, cy) = self.tris[i]
+        u, v = rng.random(), rng.random()
+        if u + v > 1.0: u, v = 1.0 - u, 1.0 - v
+        return ax + u*(bx-ax) + v*(cx-ax), ay + u*(by-ay) + v*(cy-ay)
+
+    def sample_n(self, k, rng=random):
+        """k points at once as (xs, ys) arrays; draws a NumPy seed from rng so runs stay reproducible."""
+        g = np.random.default_rng(rng.getrandbits(63))
+        i = g.integers(0, len(self.tris), k)
+        i = np.where(g.random(k) < self._prob[i], i, self._alias[i])
+        u = g.random(k); v = g.random(k)
+        flip = u + v > 1.0
+        u[flip] = 1.0 - u[flip]; v[flip] = 1.0 - v[flip]
+        p = self._a[i] + u[:, None]*self._ab[i] + v[:, None]*self._ac[i]
+        return p[:, 0], p[:, 1]
+
+def rand_in_map(rng=random): return BD_SAMPLER.sample(rng)
+def rand_in_map_n(k, rng=random): return BD_SAMPLER.sample_n(k, rng)
+
+# —— swept collision: where a moving point first touches a circle
+def segment_circle_t(x0, y0, x1, y1, cx, cy, r):
+    """Fraction along each segment (x0, y0)->(x1, y1) where it first touches the circle (cx, cy, r):
+    0 if it starts inside, inf if it never does. Arguments broadcast against each other."""
+    dx, dy = x1 - x0, y1 - y0; fx, fy = x0 - cx, y0 - cy
+    a = dx*dx + dy*dy; b = fx*dx + fy*dy; c = fx*fx + fy*fy - r*r
+    disc = b*b - a*c
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = (-b - np.sqrt(np.maximum(disc, 0.0))) / a
+    hit = (a > 0) & (disc >= 0) & (t >= 0) & (t <= 1)
+    return np.where(c <= 0, 0.0, np.where(hit, t, np.inf))
+
+# —— signed distance field: negative inside, positive outside, in world units
+SDF_CELL = 12.0
+SDF_PAD = 96.0
+SLIDE_MARGIN = 4.0
+
+def _seg_dist(px, py, ax, ay, bx, by):
+    """Distance from each point (px, py) to the nearest of the segments a->b."""
+    ex, ey = bx - ax, by - ay
+    wx, wy = px[:, None] - ax, py[:, None] - ay
+    t = np.clip((wx*ex + wy*ey) / (ex*ex + ey*ey + 1e-12), 0.0, 1.0)
+    return np.hypot(wx - t*ex, wy - t*ey).min(axis=1)
+
+SDF_TILE = 16                       # cells per side of the tiles edges are bucketed into
+
+class DistanceField:
+    """Signed distance to the coastline sampled on a grid over the map bounding box.
+
+    Queries are bilinear lookups, so containment and distance cost the same for any map,
+    and slide() lets movers that would step outside glide along the coast instead of stopping.
+    Distances are exact up to `pad` plus two cells from the coast and clamped beyond, which
+    keeps the build cost proportional to the coastline rather than to grid size x edge count.
+    `contains` is a vectorized (xs, ys) -> bool test for the same rings.
+    """
+    def __init__(self, rings, contains, cell=SDF_CELL, pad=SDF_PAD):
+        ax = np.concatenate([np.array([x for x,_ in r], float) for r in rings])
+        ay = np.concatenate([np.array([y for _,y in r], float) for r in rings])
+        bx = np.concatenate([np.roll(np.array([x for x,_ in r], float), -1) for r in rings])
+        by = np.concatenate([np.roll(np.array([y for _,y in r], float), -1) for r in rings])
+        self.cell = cell
+        self.x0 = ax.min() - pad; self.y0 = ay.min() - pad
+        self.nx = int(math.ceil((ax.max() + pad - self.x0) / cell)) + 1
+        self.ny = int(math.ceil((ay.max() + pad - self.y0) / cell)) + 1
+        band = pad + 2*cell
+        lox, hix = np.minimum(ax, bx) - band, np.maximum(ax, bx) + band
+        loy, hiy = np.minimum(ay, by) - band, np.maximum(ay, by) + band
+        gx = self.x0 + cell*np.arange(self.nx); gy = self.y0 + cell*np.arange(self.ny)
+        dist = np.full((self.ny, self.nx), band)
+        for j in range(0, self.ny, SDF_TILE):
+            ty = gy[j:j+SDF_TILE]
+            rows = (loy <= ty[-1]) & (hiy >= ty[0])
+            for i in range(0, self.nx, SDF_TILE):
+                tx = gx[i:i+SDF_TILE]
+                e = np.flatnonzero(rows & (lox <= tx[-1]) & (hix >= tx[0]))
+                if not e.size: continue
+                px, py = np.meshgrid(tx, ty)
+                d = _seg_dist(px.ravel(), py.ravel(), ax[e], ay[e], bx[e], by[e])
+                dist[j:j+SDF_TILE, i:i+SDF_TILE] = np.minimum(d, band).reshape(px.shape)
+        px, py = np.meshgrid(gx, gy)
+        self.dist = np.where(contains(px.ravel(), py.ravel()).reshape(px.shape), -dist, dist)
+        self.grad_y, self.grad_x = np.gradient(self.dist, cell)
+
+    def _lerp(self, grid, xs, ys):
+        fx = np.clip((np.asarray(xs, float) - self.x0) / self.cell, 0.0, self.nx - 1.000001)
+        fy = np.clip((np.asarray(ys, float) - self.y0) / self.cell, 0.0, self.ny - 1.000001)
+        i = fx.astype(int); j = fy.astype(int); tx = fx - i; ty = fy - j
+        top = grid[j, i]*(1-tx) + grid[j, i+1]*tx
+        bot = grid[j+1, i]*(1-tx) + grid[j+1, i+1]*tx
+        return top*(1-ty) + bot*ty
+
+    def distance(self, xs, ys): return self._lerp(self.dist, xs, ys)
+    def contains(self, xs, ys): return self._lerp(self.dist, xs, ys) < 0.0
+
+    def gradient(self, xs, ys):
+        return self._lerp(self.grad_x, xs, ys), self._lerp(self.grad_y, xs, ys)
+
+    def exit_t(self, x0, y0, x1, y1):
+        """Fraction along each segment where it first crosses the coast outwards, sampled every half
+        cell; inf for segments that stay inside or start outside."""
+        x0, y0, x1, y1 = (np.asarray(v, float) for v in (x0, y0, x1, y1))
+        n = max(1, int(math.ceil(float(np.hypot(x1 - x0, y1 - y0).max(initial=0.0)) / (0.5*self.cell))))
+        t = np.arange(n + 1) / n
+        out = self.distance(x0[:, None] + (x1 - x0)[:, None]*t, y0[:, None] + (y1 - y0)[:, None]*t) >= 0.0
+        crossed = out[:, 1:].any(axis=1) & ~out[:, 0]
+        return np.where(crossed, t[out.argmax(axis=1)], np.inf)
+
+    def slide(self, xs, ys, margin=SLIDE_MARGIN):
+        """Project points that ended up outside (or within `margin` of) the coast back along -grad."""
+        xs = np.array(xs, float); ys = np.array(ys, float)
+        for _ in range(3):
+            d = self.distance(xs, ys)
+            out = d > -margin
+            if not out.any(): break
+            gx, gy = self.gradient(xs[out], ys[out])
+            g2 = gx*gx + gy*gy + 1e-12
+            push = (d[out] + margin) / g2
+            xs[out] -= push*gx; ys[out] -= push*gy
+        return xs, ys
+
+    def slide1(self, x, y, margin=SLIDE_MARGIN):
+        xs, ys = self.slide([x], [y], margin)
+        return float(xs[0]), float(ys[0])
+
+
+# —— line of sight: two points on land are inside the convex hull, and so is the segment between
+# them, so only coast edges off the hull (bays, holes, facing island shores) can block it
+LOS_CHUNK_PAIRS = 1 << 14           # point x edge tests line_clear() does per vectorized pass
+
+def convex_hull(pts):
+    """Monotone chain; hull vertices counter-clockwise, collinear ones dropped."""
+    pts = sorted(set(pts))
+    if len(pts) < 3: return pts
+    lo, up = [], []
+    for p in pts:
+        while len(lo) >= 2 and _cross(lo[-2], lo[-1], p) <= 0: lo.pop()
+        lo.append(p)
+    for p in reversed(pts):
+        while len(up) >= 2 and _cross(up[-2], up[-1], p) <= 0: up.pop()
+        up.append(p)
+    return lo[:-1] + up[:-1]
+
+def pocket_edges(rings):
+    """(ax, ay, bx, by) arrays of every ring edge that is not a convex hull edge."""
+    hull = convex_hull([p for r in rings for p in r])
+    on_hull = {(hull[i], hull[(i+1) % len(hull)]) for i in range(len(hull))}
+    on_hull |= {(b, a) for a, b in on_hull}
+    e = [(a, b) for r in rings for a, b in zip(r, r[1:] + r[:1]) if (a, b) not in on_hull]
+    return tuple(np.array([v[k][c] for v in e], float) for k, c in ((0, 0), (0, 1), (1, 0), (1, 1)))
+
+# —— maps: outer rings and holes from any source, indexed by horizontal slabs
+EAR_CLIP_MAX = 256                  # single rings up to this size keep the ear-clipped triangulation
+
+class SlabIndex:
+    """Even-odd containment in O(log n) per point for any set of rings (islands, holes, multipolygons).
+
+    Vertex y values cut the plane into horizontal slabs; the edges crossing a slab never cross
+    each other inside it, so they are stored sorted left to right and a point is inside when
+    an odd number of them lie to its left, found by binary search.
+    """
+    def __init__(self, rings):
+        x1 = np.concatenate([np.array([x for x,_ in r], float) for r in rings])
+        y1 = np.concatenate([np.array([y for _,y in r], float) for r in rings])
+        x2 = np.concatenate([np.roll(np.array([x for x,_ in r], float), -1) for r in rings])
+        y2 = np.concatenate([np.roll(np.array([y for _,y in r], float), -1) for r in rings])
+        keep = y1 != y2
+        x1, y1, x2, y2 = x1[keep], y1[keep], x2[keep], y2[keep]
+        self.ys = ys = np.unique(np.concatenate([y1, y2]))
+        s0 = np.searchsorted(ys, np.minimum(y1, y2)); s1 = np.searchsorted(ys, np.maximum(y1, y2))
+        cnt = s1 - s0
+        e = np.repeat(np.arange(len(x1)), cnt)
+        slab = np.repeat(s0, cnt) + (np.arange(cnt.sum()) - np.repeat(np.cumsum(cnt) - cnt, cnt))
+        k = (x2 - x1) / (y2 - y1)
+        xm = x1[e] + k[e]*(0.5*(ys[slab] + ys[slab + 1]) - y1[e])
+        order = np.lexsort((xm, slab))
+        e, slab = e[order], slab[order]
+        self.start = np.searchsorted(slab, np.arange(len(ys)))
+        self.x1, self.y1, self.k = x1[e], y1[e], k[e]
+        self.steps = int(np.diff(self.start).max(initial=0)).bit_length()
+
+    def x_at(self, i, y): return self.x1[i] + self.k[i]*(y - self.y1[i])
+
+    def contains(self, xs, ys):
+        xs = np.asarray(xs, float); ys = np.asarray(ys, float)
+        s = np.searchsorted(self.ys, ys, side="right") - 1
+        ok = (s >= 0) & (s < len(self.ys) - 1)
+        s = np.where(ok, s, 0)
+        lo = self.start[s].copy(); hi = np.where(ok, self.start[s + 1], lo)
+        first = lo.copy(); top = max(len(self.x1) - 1, 0)
+        for _ in range(self.steps):
+            act = lo < hi
+            if not act.any(): break
+            mid = np.minimum((lo + hi) // 2, top)
+            left = self.x_at(mid, ys) < xs
+            lo = np.where(act & left, mid + 1, lo); hi = np.where(act & ~left, mid, hi)
+        return ok & ((lo - first) & 1).astype(bool)
+
+    def trapezoids(self):
+        """The inside of every slab as triangles (two per trapezoid), counter-clockwise."""
+        l = np.arange(0, len(self.x1), 2); r = l + 1
+        slab = np.searchsorted(self.start, l, side="right") - 1
+        yb, yt = self.ys[slab], self.ys[slab + 1]
+        lb, lt, rb, rt = self.x_at(l, yb), self.x_at(l, yt), self.x_at(r, yb), self.x_at(r, yt)
+        tris = []
+        for a, b, c, d, y0, y1 in zip(lb.tolist(), rb.tolist(), rt.tolist(), lt.tolist(), yb.tolist(), yt.tolist()):
+            if b > a: tris.append(((a, y0), (b, y0), (c, y1)))
+            if c > d: tris.append(((a, y0), (c, y1), (d, y1)))
+        return tris
+
+class GameMap:
+    """A playable area: rings (outer boundaries and holes, even-odd) plus everything derived from them.
+
+    min/max_x/y, w, h and radius are the bounding-box figures the camera is tuned from;
+    contains() goes through the slab index, sample()/sample_n() through triangles, and
+    sdf is the DistanceField movers slide along.
+    """
+    def __init__(self, rings):
+        self.rings = [[(float(x), float(y)) for x, y in r] for r in rings if len(r) >= 3]
+        pts = [p for r in self.rings for p in r]
+        self.min_x = min(x for x,_ in pts); self.max_x = max(x for x,_ in pts)
+        self.min_y = min(y for _,y in pts); self.max_y = max(y for _,y in pts)
+        self.w = self.max_x - self.min_x; self.h = self.max_y - self.min_y
+        self.radius = 0.5*max(self.w, self.h)
+        self.center = (0.5*(self.min_x + self.max_x), 0.5*(self.min_y + self.max_y))
+        self.index = SlabIndex(self.rings)
+        if len(self.rings) == 1 and len(self.rings[0]) <= EAR_CLIP_MAX:
+            r = self.rings[0]
+            tris = [(r[a], r[b], r[c]) for a, b, c in triangulate(r)]
+        else:
+            tris = self.index.trapezoids()
+        self.sampler = PolySampler(tris)
+        self.sdf = DistanceField(self.rings, self.index.contains)
+        self.pockets = pocket_edges(self.rings)
+
+    def contains(self, x, y): return bool(self.index.contains([x], [y])[0])
+    def contains_many(self, xs, ys): return self.index.contains(xs, ys)
+    def sample(self, rng=random): return self.sampler.sample(rng)
+    def sample_n(self, k, rng=random): return self.sampler.sample_n(k, rng)
+
+    def line_clear(self, xs, ys, x, y):
+        """For points (xs, ys) on land, whether the straight line to (x, y) crosses no coast.
+        Every point is tested against every pocket edge, LOS_CHUNK_PAIRS point x edge pairs at a time."""
+        ax, ay, bx, by = self.pockets
+        xs = np.asarray(xs, float); ys = np.asarray(ys, float)
+        if not ax.size: return np.ones(len(xs), bool)
+        ex, ey = bx - ax, by - ay
+        side = ex*(y - ay) - ey*(x - ax)                            # which side of each edge (x, y) is on
+        out = np.empty(len(xs), bool)
+        step = max(1, LOS_CHUNK_PAIRS // ax.size)
+        for i in range(0, len(xs), step):
+            px, py = xs[i:i+step, None], ys[i:i+step, None]
+            vx, vy = px - x, py - y
+            across = (ey*(px - ax) - ex*(py - ay))*side > 0
+            between = (vy*(ax - x) - vx*(ay - y))*(vy*(bx - x) - vx*(by - y)) < 0
+            out[i:i+step] = ~(across & between).any(axis=1)
+        return out
+
+def _strip(ring):
+    ring = [tuple(p[:2]) for p in ring]
+    return ring[:-1] if len(ring) > 1 and ring[0] == ring[-1] else ring
+
+def geojson_rings(obj):
+    """Every ring of the (Multi)Polygon geometries in a GeoJSON object, outer boundaries and holes alike."""
+    t = obj.get("type")
+    if t == "FeatureCollection": return [r for f in obj["features"] for r in geojson_rings(f)]
+    if t == "Feature": return geojson_rings(obj["geometry"] or {})
+    if t == "GeometryCollection": return [r for g in obj["geometries"] for r in geojson_rings(g)]
+    if t == "Polygon": return [_strip(r) for r in obj["coordinates"]]
+    if t == "MultiPolygon": return [_strip(r) for poly in obj["coordinates"] for r in poly]
+    return []
+
+def text_rings(text):
+    """Rings from a plain polygon file: one "x y" (or "x,y") pair per line, blank lines between rings, # comments."""
+    rings, cur = [], []
+    for line in text.splitlines() + [""]:
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            if cur: rings.append(_strip(cur)); cur = []
+            continue
+        x, y = line.replace(",", " ").split()[:2]
+        cur.append((float(x), float(y)))
+    return rings
+
+def load_map(path, size=None):
+    """GameMap from a .geojson/.json or plain polygon file, centred on the origin and scaled so its
+    larger side is `size` world units (default: as large as the built-in map).
+
+    GeoJSON longitudes are shrunk by cos(latitude) first so outlines keep their shape.
+    """
+    import json
+    with open(path) as fh: text = fh.read()
+    if path.lower().endswith((".geojson", ".json")):
+        rings = geojson_rings(json.loads(text))
+        lat = np.mean([y for r in rings for _, y in r])
+        rings = [[(x*math.cos(math.radians(lat)), y) for x, y in r] for r in rings]
+    else:
+        rings = text_rings(text)
+    rings = [r for r in rings if len(r) >= 3]
+    if not rings: raise ValueError(f"{path}: no polygon rings found")
+    pts = [p for r in rings for p in r]
+    cx = 0.5*(min(x for x,_ in pts) + max(x for x,_ in pts)); cy = 0.5*(min(y for _,y in pts) + max(y for _,y in pts))
+    span = max(max(x for x,_ in pts) - min(x for x,_ in pts), max(y for _,y in pts) - min(y for _,y in pts))
+    sc = (size or 2*MAP_RADIUS) / span
+    return GameMap([[((x - cx)*sc, (y - cy)*sc) for x, y in r] for r in rings])
+
+BD_MAP = GameMap([BD_POLY])
+BD_SAMPLER = BD_MAP.sampler
+BD_SDF = BD_MAP.sdf
@@ -0,0 +1,131 @@
+"""Triangle meshes as NumPy arrays, for drawing many copies of a model in one call."""
+import math
+import numpy as np
+
+class Mesh:
+    """Indexed triangles with a per-vertex colour; verts/colors float32 (n, 3), idx uint32."""
+    def __init__(self, verts, idx, colors):
+        self.verts = np.asarray(verts, np.float32).reshape(-1, 3)
+        self.idx = np.asarray(idx, np.uint32).ravel()
+        self.colors = np.asarray(colors, np.float32).reshape(-1, 3)
+        self._batch_cap = 0; self._batch_idx = self._batch_colors = None
+
+    def moved(self, dx=0.0, dy=0.0, dz=0.0, rot_x_deg=0.0):
+        """Copy rotated about X (as glRotatef(a,1,0,0)) and then translated."""
+        v = self.verts.astype(float)
+        if rot_x_deg:
+            a = math.radians(rot_x_deg); c, s = math.cos(a), math.sin(a)
+            y, z = v[:, 1].copy(), v[:, 2].copy()
+            v[:, 1] = c*y - s*z; v[:, 2] = s*y + c*z
+        return Mesh(v + (dx, dy, dz), self.idx, self.colors)
+
+    @staticmethod
+    def merge(*meshes):
+        base = np.cumsum([0] + [len(m.verts) for m in meshes[:-1]])
+        return Mesh(np.concatenate([m.verts for m in meshes]),
+                    np.concatenate([m.idx + b for m, b in zip(meshes, base)]),
+                    np.concatenate([m.colors for m in meshes]))
+
+    def transformed(self, m):
+        """Copy with every vertex mapped through the 4x4 matrix m (column vectors)."""
+        return Mesh(self.verts @ m[:3, :3].T.astype(np.float32) + m[:3, 3], self.idx, self.colors)
+
+    def _indices(self, n):
+        """Index array for n copies laid end to end. It and the tiled colours are cached at a growing
+        capacity and sliced, so a count that changes every frame does not rebuild them."""
+        if n > self._batch_cap:
+            cap = max(n, 2*self._batch_cap)
+            self._batch_idx = (self.idx[None, :] + (len(self.verts)*np.arange(cap, dtype=np.uint32))[:, None]).ravel()
+            self._batch_colors = np.tile(self.colors, (cap, 1))
+            self._batch_cap = cap
+        return self._batch_idx[:n*len(self.idx)]
+
+    def batch(self, mats, tints=None):
+        """(verts, colors, idx) for one copy per (n, 4, 4) matrix, ready for a single draw call.
+        `tints` (n, 3) multiplies each copy's vertex colours."""
+        mats = np.asarray(mats, np.float32); n = len(mats); nv = len(self.verts)
+        verts = (np.einsum("nij,vj->nvi", mats[:, :3, :3], self.verts) + mats[:, None, :3, 3]).reshape(-1, 3)
+        idx = self._indices(n)
+        colors = self._batch_colors[:n*nv]
+        if tints is not None: colors = (colors.reshape(n, nv, 3)*np.asarray(tints, np.float32)[:, None, :]).reshape(-1, 3)
+        return verts, colors, idx
+
+def sphere_mesh(r, slices, stacks, rgb):
+    """UV sphere like gluSphere(r, slices, stacks), centred at the origin."""
+    th = np.linspace(0.0, math.pi, stacks + 1)[:, None]
+    ph = np.linspace(0.0, 2*math.pi, slices + 1)[None, :]
+    v = np.stack([r*np.sin(th)*np.cos(ph), r*np.sin(th)*np.sin(ph), r*np.cos(th)*np.ones_like(ph)], -1).reshape(-1, 3)
+    i = np.arange(stacks)[:, None]*(slices + 1) + np.arange(slices)[None, :]
+    a, b, c, d = i, i + 1, i + slices + 1, i + slices + 2
+    idx = np.stack([a, c, b, b, c, d], -1).reshape(-1)
+    return Mesh(v, idx, np.tile(rgb, (len(v), 1)))
+
+def cone_mesh(r, h, slices, rgb):
+    """Open cone like gluCylinder(q, 0, r, h, slices, 1): apex at the origin, rim at z = h."""
+    ph = np.linspace(0.0, 2*math.pi, slices + 1)
+    rim = np.stack([r*np.cos(ph), r*np.sin(ph), np.full_like(ph, h)], -1)
+    v = np.vstack([[0.0, 0.0, 0.0], rim])
+    k = np.arange(slices)
+    idx = np.stack([np.zeros_like(k), k + 1, k + 2], -1).reshape(-1)
+    return Mesh(v, idx, np.tile(rgb, (len(v), 1)))
+
+def disk_mesh(inner, outer, slices, rgb):
+    """Flat annulus like gluDisk(q, inner, outer, slices, 1), in the z = 0 plane."""
+    ph = np.linspace(0.0, 2*math.pi, slices + 1)
+    ring = lambda r: np.stack([r*np.cos(ph), r*np.sin(ph), np.zeros_like(ph)], -1)
+    v = np.vstack([ring(outer), ring(inner)])
+    k = np.arange(slices); o, i = k, k + slices + 1
+    idx = np.stack([o, o + 1, i + 1, o, i + 1, i], -1).reshape(-1)
+    return Mesh(v, idx, np.tile(rgb, (len(v), 1)))
+
+def cube_mesh(size, rgb):
+    """Axis-aligned cube like glutSolidCube(size), centred at the origin."""
+    h = 0.5*size
+    v = np.array([(x, y, z) for z in (-h, h) for y in (-h, h) for x in (-h, h)])
+    idx = [0, 2, 1, 1, 2, 3,  4, 5, 6, 5, 7, 6,  0, 1, 4, 1, 5, 4,
+           2, 6, 3, 3, 6, 7,  0, 4, 2, 2, 4, 6,  1, 3, 5, 3, 7, 5]
+    return Mesh(v, idx, np.tile(rgb, (8, 1)))
+
+# —— 4x4 transforms for column vectors (M @ [x, y, z, 1]), matching the fixed-function calls named
+def translate(x, y, z):
+    m = np.eye(4); m[:3, 3] = x, y, z
+    return m
+
+def scale(x, y, z): return np.diag([x, y, z, 1.0])
+
+def rotate(deg, x, y, z):
+    """The matrix glRotatef(deg, x, y, z) multiplies in."""
+    a = math.radians(deg); c, s = math.cos(a), math.sin(a)
+    x, y, z = np.array([x, y, z], float) / math.sqrt(x*x + y*y + z*z)
+    m = np.eye(4)
+    m[:3, :3] = [[c + x*x*(1-c), x*y*(1-c) - z*s, x*z*(1-c) + y*s],
+                 [y*x*(1-c) + z*s, c + y*y*(1-c), y*z*(1-c) - x*s],
+                 [z*x*(1-c) - y*s, z*y*(1-c) + x*s, c + z*z*(1-c)]]
+    return m
+
+def instances(xs, ys, zs=0.0, rot_z_deg=None, scales=None):
+    """(n, 4, 4) matrices translate(x, y, z) @ rotate(rot, 0, 0, 1) @ scale(*s), built in one pass."""
+    n = len(xs)
+    m = np.zeros((n, 4, 4), np.float32)
+    c, s = (1.0, 0.0) if rot_z_deg is None else (np.cos(np.radians(rot_z_deg)), np.sin(np.radians(rot_z_deg)))
+    sx, sy, sz = (1.0, 1.0, 1.0) if scales is None else (scales[:, 0], scales[:, 1], scales[:, 2])
+    m[:, 0, 0] = c*sx; m[:, 0, 1] = -s*sy; m[:, 1, 0] = s*sx; m[:, 1, 1] = c*sy; m[:, 2, 2] = sz
+    m[:, 0, 3] = xs; m[:, 1, 3] = ys; m[:, 2, 3] = zs; m[:, 3, 3] = 1.0
+    return m
+
+def perspective(fovy_deg, aspect, near, far):
+    """gluPerspective's matrix."""
+    f = 1.0 / math.tan(math.radians(fovy_deg) / 2)
+    m = np.zeros((4, 4))
+    m[0, 0] = f / aspect; m[1, 1] = f
+    m[2, 2] = (far + near) / (near - far); m[2, 3] = 2*far*near / (near - far); m[3, 2] = -1.0
+    return m
+
+def look_at(eye, target, up=(0.0, 0.0, 1.0)):
+    """gluLookAt's matrix."""
+    e = np.array(eye, float); f = np.array(target, float) - e; f /= np.linalg.norm(f)
+    s = np.cross(f, up); s /= np.linalg.norm(s)
+    u = np.cross(s, f)
+    m = np.eye(4)
+    m[0, :3], m[1, :3], m[2, :3] = s, u, -f
+    return m @ translate(*(-e))
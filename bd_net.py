@@ -0,0 +1,427 @@
+"""Server-authoritative matches over UDP: the server steps every World, clients send inputs and draw snapshots.
+
+One Server process hosts any number of matches, one World each. The first client to join a
+match plays it; later ones spectate. Clients tick at the server's rate. Each tick they send
+their oldest unacknowledged inputs, one bitmask byte per tick (a lost packet is covered by the next),
+and predict their own movement and view toggle. When a snapshot arrives they reset to the
+server's pose and replay the inputs it has not applied yet.
+
+Snapshots are int16-quantized and sent every SNAPSHOT_EVERY ticks. They are delta-encoded
+against the newest snapshot the client has acknowledged; see _pack_section. Particles are
+cosmetic and not replicated. Wire format, little-endian:
+
+    JOIN      u8 1  u16 match  u8 spectate
+    WELCOME   u8 2  u16 match  u8 spectating  i64 seed  f64 tick_dt  f32 pos_q  u32 tick
+    INPUT     u8 3  u32 ack_tick  u32 first_seq  u8 n  n x u8 key mask (bit i = bd_replay.CODES[i])
+    SNAPSHOT  u8 4  u32 tick  u32 base_tick  u32 input_seq  3 sections (scalars, rabs, bullets)
+    LEAVE     u8 5
+
+    python bd_net.py serve --port 47800                  # then: python HasinaSlayer.py --connect 127.0.0.1:47800
+    python bd_net.py bench --matches 32 --loss 0.05      # bots over localhost: bytes/s per client, server ms/tick
+"""
+import argparse, random, select, socket, struct, time
+import numpy as np
+from bd_map import BD_MAP, load_map
+from bd_sim import World, IN_FIRE, IN_VIEW, WEAPON_GUN, WEAPON_SWORD
+from bd_replay import CODES
+
+PORT = 47800
+SNAPSHOT_EVERY = 2                  # ticks per snapshot: 30 Hz at the 60 Hz tick
+HISTORY = 32                        # snapshots a delta may be based on, server side
+INPUT_WINDOW = 32                   # unacknowledged inputs re-sent per packet, oldest first
+INPUT_HOLD = INPUT_WINDOW*4         # inputs a client keeps unacknowledged, and the server buffers ahead of applied
+MAX_INPUTS_PER_TICK = 4             # a client running ahead catches up this fast
+CLIENT_TIMEOUT = 5.0
+UDP_OVERHEAD = 28                   # IPv4 + UDP header bytes, counted in the bandwidth figures
+FLOW_RETARGET_CELLS = 2             # server worlds rebuild the rabs' flow field only once the player is this many cells on
+
+JOIN, WELCOME, INPUT, SNAPSHOT, LEAVE = 1, 2, 3, 4, 5
+NONE = 0xFFFFFFFF
+_JOIN = struct.Struct("<BHB")
+_WELCOME = struct.Struct("<BHBqdfI")
+_INPUT = struct.Struct("<BIIB")
+_SNAP = struct.Struct("<BIII")
+_SECTION = struct.Struct("<BH")
+FULL, DELTA8, DELTA16 = 0, 1, 2
+
+_BIT = {k: 1 << i for i, k in enumerate(CODES)}
+PREDICTED = (b'w', b's', b'a', b'd', IN_VIEW)
+
+def key_mask(inputs):
+    m = 0
+    for k in inputs: m |= _BIT.get(k, 0)
+    return m
+
+def mask_keys(m): return tuple(k for i, k in enumerate(CODES) if m >> i & 1)
+
+# —— snapshots: three int16 sections, positions in units of pos_q
+F_GUN, F_OVER, F_WIN, F_SWING, F_FP, F_BREAK = 1, 2, 4, 8, 16, 32
+Q_NONE = -32768                     # absent pickup
+
+def pos_quantum(game_map):
+    """World units per int16 step, so every point of the map fits with room to spare."""
+    ext = max(abs(game_map.min_x), abs(game_map.max_x), abs(game_map.min_y), abs(game_map.max_y))
+    return max(0.25, ext / 30000.0)
+
+def _q(v, q): return np.clip(np.round(np.asarray(v, float) / q), -32767, 32767).astype(np.int16)
+
+def quantize(w, q):
+    """(scalars, rabs, bullets) int16 arrays for World w; rabs are x then y, bullets x, y, z."""
+    now = w.clock()
+    flags = (F_GUN*(w.weapon == WEAPON_GUN) | F_OVER*w.game_over | F_WIN*w.win | F_SWING*w.swing_active
+             | F_FP*w.first_person | F_BREAK*w.break_fx_active)
+    picks = []
+    for p in (w.sword_pick, w.gun_pick, w.ammo_pick):
+        picks += [Q_NONE, Q_NONE] if p is None else [p["x"]/q, p["y"]/q]
+    s = np.array([w.px/q, w.py/q, 0, w.has_x/q, w.has_y/q, w.lives, w.ammo, w.sword_uses,
+                  w.rab_kills_for_upgrade, flags, *picks, (now - w.swing_t0)*1000.0*w.swing_active])
+    s = np.clip(np.round(s), -32768, 32767).astype(np.int16)
+    s[2] = np.uint16(round(w.yaw_deg % 360.0 * 65536.0/360.0) & 0xFFFF).view(np.int16)
+    return s, np.concatenate([_q(w.rabs.x, q), _q(w.rabs.y, q)]), \
+        np.concatenate([_q(w.bullets.x, q), _q(w.bullets.y, q), _q(w.bullets.z, q)])
+
+def _pack_section(cur, base):
+    """Changed-element bitmask plus int8/int16 deltas when base has the same length, else the full array.
+    Deltas wrap in int16, so decoding is exact whatever the values."""
+    if base is None or len(base) != len(cur):
+        return _SECTION.pack(FULL, len(cur)) + cur.tobytes()
+    d = cur - base
+    ch = d != 0
+    v = d[ch]
+    small = not v.size or (v.min() >= -128 and v.max() <= 127)
+    return (_SECTION.pack(DELTA8 if small else DELTA16, len(cur)) + np.packbits(ch).tobytes()
+            + (v.astype(np.int8) if small else v).tobytes())
+
+def _unpack_section(buf, off, base):
+    kind, n = _SECTION.unpack_from(buf, off); off += _SECTION.size
+    if kind == FULL:
+        return np.frombuffer(buf, np.int16, n, off).copy(), off + 2*n
+    if base is None or len(base) != n: raise ValueError("delta against a missing or mismatched baseline")
+    nb = (n + 7) // 8
+    ch = np.unpackbits(np.frombuffer(buf, np.uint8, nb, off))[:n].astype(bool); off += nb
+    k = int(np.count_nonzero(ch))
+    dt, size = (np.int8, 1) if kind == DELTA8 else (np.int16, 2)
+    cur = base.copy()
+    cur[ch] += np.frombuffer(buf, dt, k, off).astype(np.int16)
+    return cur, off + size*k
+
+def pack_snapshot(tick, state, base_tick, base, input_seq):
+    parts = [_SNAP.pack(SNAPSHOT, tick, base_tick, input_seq)]
+    for i, cur in enumerate(state): parts.append(_pack_section(cur, None if base is None else base[i]))
+    return b"".join(parts)
+
+def unpack_snapshot(buf, history):
+    """(tick, state, input_seq); the baseline is looked up in history, a {tick: state} dict."""
+    _, tick, base_tick, input_seq = _SNAP.unpack_from(buf)
+    base = None if base_tick == NONE else history.get(base_tick)
+    if base_tick != NONE and base is None: raise ValueError(f"baseline {base_tick} no longer held")
+    off, state = _SNAP.size, []
+    for i in range(3):
+        sec, off = _unpack_section(buf, off, None if base is None else base[i])
+        state.append(sec)
+    return tick, tuple(state), input_seq
+
+# —— server
+class _Peer:
+    __slots__ = ("addr", "match", "spectator", "ack", "seen", "bytes", "packets")
+    def __init__(self, addr, match, spectator, now):
+        self.addr, self.match, self.spectator = addr, match, spectator
+        self.ack = NONE; self.seen = now; self.bytes = 0; self.packets = 0
+
+class Match:
+    """One World, its player's pending inputs and the recent snapshots deltas are taken against."""
+    def __init__(self, mid, seed, game_map):
+        self.id, self.seed = mid, seed
+        self.world = World(seed, game_map=game_map, flow_retarget_cells=FLOW_RETARGET_CELLS)
+        self.q = pos_quantum(self.world.map)
+        self.tick = 0
+        self.player = None
+        self.inputs = {}; self.applied = 0
+        self.history = {}; self._encoded = {}
+
+    def step(self, dt):
+        keys = []
+        for _ in range(MAX_INPUTS_PER_TICK):
+            m = self.inputs.pop(self.applied + 1, None)
+            if m is None: break
+            self.applied += 1; keys += mask_keys(m)
+        self.world.step(dt, keys)
+        self.tick += 1
+
+    def snapshot(self):
+        state = quantize(self.world, self.q)
+        self.history[self.tick] = state
+        self.history.pop(self.tick - HISTORY*SNAPSHOT_EVERY, None)
+        self._encoded = {}
+
+    def encoded(self, base_tick, input_seq):
+        """This tick's snapshot against base_tick; shared by every peer with the same baseline."""
+        base = self.history.get(base_tick)
+        if base is None: base_tick = NONE
+        key = (base_tick, input_seq)
+        b = self._encoded.get(key)
+        if b is None: b = self._encoded[key] = pack_snapshot(self.tick, self.history[self.tick], base_tick, base, input_seq)
+        return b
+
+class Server:
+    """Non-blocking UDP server; call poll() and tick() yourself, or serve() for a real-time loop."""
+    def __init__(self, host="127.0.0.1", port=PORT, tick_dt=1.0/60.0, game_map=None, seed=None, loss=0.0):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port)); self.sock.setblocking(False)
+        self.addr = self.sock.getsockname()
+        self.tick_dt, self.map = tick_dt, game_map if game_map is not None else BD_MAP
+        self.rng = random.Random(seed); self.loss = loss
+        self.matches, self.peers = {}, {}
+        self.ticks = 0; self.tick_time = []; self.sim_time = 0.0    # seconds per tick(), all matches; of that, World.step
+
+    def _send(self, peer, data):
+        peer.bytes += len(data) + UDP_OVERHEAD; peer.packets += 1
+        if self.loss and self.rng.random() < self.loss: return
+        try: self.sock.sendto(data, peer.addr)
+        except (BlockingIOError, ConnectionRefusedError): pass
+
+    def _join(self, addr, mid, spectate, now):
+        m = self.matches.get(mid)
+        if m is None: m = self.matches[mid] = Match(mid, self.rng.getrandbits(63), self.map)
+        peer = self.peers.get(addr)
+        if peer is None:
+            spectate = spectate or m.player is not None
+            peer = self.peers[addr] = _Peer(addr, m, spectate, now)
+            if not spectate: m.player = peer
+        self._send(peer, _WELCOME.pack(WELCOME, mid, peer.spectator, m.seed, self.tick_dt, m.q, m.tick))
+
+    def _leave(self, peer):
+        del self.peers[peer.addr]
+        m = peer.match
+        if m.player is peer: m.player = None; m.inputs.clear()
+        if not any(p.match is m for p in self.peers.values()): del self.matches[m.id]
+
+    def poll(self):
+        """Handle every datagram waiting on the socket."""
+        now = time.monotonic()
+        while True:
+            try: data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, ConnectionResetError): break
+            if not data: continue
+            kind = data[0]
+            if kind == JOIN and len(data) >= _JOIN.size:
+                _, mid, spectate = _JOIN.unpack_from(data)
+                self._join(addr, mid, bool(spectate), now); continue
+            peer = self.peers.get(addr)
+            if peer is None: continue
+            peer.seen = now
+            if kind == LEAVE: self._leave(peer)
+            elif kind == INPUT and len(data) >= _INPUT.size:
+                _, ack, first, n = _INPUT.unpack_from(data)
+                if ack != NONE and (peer.ack == NONE or ack > peer.ack): peer.ack = ack
+                m = peer.match
+                if m.player is peer:
+                    if first > m.applied + 1:                  # the client dropped the gap: it can never be filled
+                        m.applied = first - 1
+                        m.inputs = {k: v for k, v in m.inputs.items() if k > m.applied}
+                    for i, b in enumerate(data[_INPUT.size:_INPUT.size + n]):
+                        if m.applied < first + i <= m.applied + INPUT_HOLD: m.inputs[first + i] = b
+
+    def tick(self):
+        """Step every match once and send snapshots when one is due."""
+        t0 = time.perf_counter()
+        now = time.monotonic()
+        for peer in [p for p in self.peers.values() if now - p.seen > CLIENT_TIMEOUT]: self._leave(peer)
+        for m in self.matches.values():
+            ts = time.perf_counter(); m.step(self.tick_dt); self.sim_time += time.perf_counter() - ts
+            if m.tick % SNAPSHOT_EVERY: continue
+            m.snapshot()
+            for peer in self.peers.values():
+                if peer.match is m:
+                    self._send(peer, m.encoded(peer.ack, NONE if peer.spectator else m.applied))
+        self.ticks += 1
+        self.tick_time.append(time.perf_counter() - t0)
+
+    def stats(self):
+        secs = max(self.ticks*self.tick_dt, 1e-9)
+        tt = np.array(self.tick_time or [0.0])*1000.0
+        bps = [p.bytes/secs for p in self.peers.values()]
+        return {"matches": len(self.matches), "clients": len(self.peers),
+                "server_ms_per_tick": float(tt.mean()), "server_ms_per_tick_p99": float(np.percentile(tt, 99)),
+                "ms_per_match_tick": float(tt.mean()/max(len(self.matches), 1)),
+                "net_ms_per_tick": float(tt.mean() - 1000.0*self.sim_time/max(self.ticks, 1)),
+                "bytes_per_client_s": float(np.mean(bps)) if bps else 0.0,
+                "packets_per_client_s": float(np.mean([p.packets/secs for p in self.peers.values()])) if bps else 0.0}
+
+    def serve(self, report_every=5.0):
+        """Real-time loop: tick at tick_dt, sleep in select() between ticks, print stats now and then."""
+        nxt = time.perf_counter(); last = nxt
+        while True:
+            self.poll()
+            now = time.perf_counter()
+            if now >= nxt:
+                self.tick(); nxt = max(nxt + self.tick_dt, now - self.tick_dt)
+            if report_every and now - last >= report_every:
+                st = self.stats(); last = now
+                print(f"{st['matches']} matches  {st['clients']} clients  {st['server_ms_per_tick']:.3f} ms/tick"
+                      f"  {st['bytes_per_client_s']/1024:.2f} KiB/s per client", flush=True)
+                self.ticks = 0; self.tick_time.clear(); self.sim_time = 0.0
+                for p in self.peers.values(): p.bytes = p.packets = 0
+            select.select([self.sock], [], [], max(0.0, nxt - time.perf_counter()))
+
+# —— client
+class NetClient:
+    """One player or spectator. After connect(), call tick(inputs) once per simulation tick and
+    draw .world, a local World mirroring the server's with the player's own movement predicted."""
+    def __init__(self, server, match=0, spectate=False, game_map=None, loss=0.0, seed=None):
+        self.server = server
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(("127.0.0.1" if server[0] in ("127.0.0.1", "localhost") else "", 0))
+        self.sock.setblocking(False)
+        self.match, self.spectator, self.map = match, spectate, game_map
+        self.loss, self.rng = loss, random.Random(seed)
+        self.world = None
+        self.seq = 0; self.pending = []
+        self.history = {}; self.ack = NONE
+        self.bytes_in = self.bytes_out = 0
+        self.snapshots = self.mispredicted = 0
+        self._send(_JOIN.pack(JOIN, match, spectate))
+
+    def _send(self, data):
+        self.bytes_out += len(data) + UDP_OVERHEAD
+        if self.loss and self.rng.random() < self.loss: return
+        try: self.sock.sendto(data, self.server)
+        except (BlockingIOError, ConnectionRefusedError): pass
+
+    def connect(self, timeout=5.0, pump=None):
+        """Wait for WELCOME, re-sending JOIN; pump() runs each turn, e.g. an in-process server's poll."""
+        t_end = time.monotonic() + timeout; t_join = time.monotonic()
+        while self.world is None:
+            if pump is not None: pump()
+            self.poll()
+            now = time.monotonic()
+            if self.world is not None: break
+            if now > t_end: raise TimeoutError(f"no answer from {self.server[0]}:{self.server[1]}")
+            if now - t_join > 0.25: self._send(_JOIN.pack(JOIN, self.match, self.spectator)); t_join = now
+            if pump is None: select.select([self.sock], [], [], 0.05)
+        return self
+
+    def poll(self):
+        newest = None
+        while True:
+            try: data = self.sock.recv(65536)
+            except (BlockingIOError, ConnectionRefusedError, ConnectionResetError): break
+            self.bytes_in += len(data) + UDP_OVERHEAD
+            if data[0] == WELCOME and self.world is None:
+                _, self.match, spect, seed, self.tick_dt, self.q, _ = _WELCOME.unpack_from(data)
+                self.spectator = bool(spect)
+                self.world = World(seed, game_map=self.map)
+            elif data[0] == SNAPSHOT and self.world is not None:
+                try: tick, state, input_seq = unpack_snapshot(data, self.history)
+                except ValueError: continue
+                if self.ack != NONE and tick <= self.ack: continue
+                self.history[tick] = state; self.ack = tick
+                for t in [t for t in self.history if t < tick - 2*HISTORY*SNAPSHOT_EVERY]: del self.history[t]
+                newest = (state, input_seq)
+        if newest is not None: self._apply(*newest)
+
+    def _apply(self, state, input_seq):
+        """Take the server's state; replay the inputs it has not applied on top of its player pose."""
+        w, q = self.world, self.q
+        s, rabs, bul = state
+        f = int(s[9])
+        predicted = (w.px, w.py, w.yaw_deg, w.first_person)
+        w.px, w.py = s[0]*q, s[1]*q
+        w.yaw_deg = float(s[2].view(np.uint16))*360.0/65536.0
+        w.has_x, w.has_y = s[3]*q, s[4]*q
+        w.lives, w.ammo, w.sword_uses, w.rab_kills_for_upgrade = (int(v) for v in s[5:9])
+        w.weapon = WEAPON_GUN if f & F_GUN else WEAPON_SWORD
+        w.game_over, w.win, w.first_person = bool(f & F_OVER), bool(f & F_WIN), bool(f & F_FP)
+        w.break_fx_active = bool(f & F_BREAK)
+        if f & F_SWING and not w.swing_active: w.swing_t0 = w.clock() - int(s[16])/1000.0
+        w.swing_active = bool(f & F_SWING)
+        w.sword_pick, w.gun_pick, w.ammo_pick = (None if s[i] == Q_NONE else {"x": s[i]*q, "y": s[i+1]*q}
+                                                 for i in (10, 12, 14))
+        n = len(rabs)//2
+        _assign(w.rabs, n, x=rabs[:n]*q, y=rabs[n:]*q)
+        n = len(bul)//3
+        _assign(w.bullets, n, x=bul[:n]*q, y=bul[n:2*n]*q, z=bul[2*n:]*q)
+        if input_seq != NONE:
+            self.pending = [(seq, m) for seq, m in self.pending if seq > input_seq]
+            for _, m in self.pending: self._predict(mask_keys(m))
+            if (abs(w.px - predicted[0]) > 2*q or abs(w.py - predicted[1]) > 2*q
+                    or w.first_person != predicted[3]): self.mispredicted += 1
+        self.snapshots += 1
+
+    def _predict(self, keys):
+        w = self.world
+        for k in keys:
+            if k in PREDICTED: w.apply_input(k, self.tick_dt)
+
+    def tick(self, inputs=()):
+        """Send this tick's inputs, predict their effect on the player and take in any snapshot."""
+        w = self.world
+        w.save_prev()
+        w.clock.advance(self.tick_dt)
+        if not self.spectator:
+            self.seq += 1
+            self.pending.append((self.seq, key_mask(inputs)))
+            del self.pending[:-INPUT_HOLD]
+            self._predict(inputs)
+        self.poll()
+        send = self.pending[:INPUT_WINDOW]
+        first = send[0][0] if send else self.seq + 1
+        self._send(_INPUT.pack(INPUT, self.ack, first, len(send)) + bytes(m for _, m in send))
+
+    def close(self):
+        self._send(bytes([LEAVE])); self.sock.close()
+
+def _assign(pool, n, **cols):
+    """Overwrite pool's rows with cols; rows keep their prev values for lerp when the count is unchanged."""
+    if n != len(pool):
+        pool.clear(); pool.add_many(n, **cols); return
+    for f, v in cols.items(): getattr(pool, f)[:] = v
+
+def parse_addr(s):
+    host, _, port = s.rpartition(":")
+    return host or "127.0.0.1", int(port or PORT)
+
+# —— load test: bots over localhost, in lock-step with an in-process server, faster than real time
+def bench(matches=16, spectators=1, seconds=10.0, loss=0.0, tick_dt=1.0/60.0, seed=0):
+    srv = Server(port=0, tick_dt=tick_dt, seed=seed, loss=loss)
+    rng = random.Random(seed)
+    bots = []
+    for m in range(matches):
+        for s in range(1 + spectators):
+            c = NetClient(srv.addr, m, spectate=s > 0, loss=loss, seed=rng.getrandbits(32))
+            bots.append(c.connect(pump=srv.poll))
+    moves = ((), (b'w',), (b's',), (b'a',), (b'd',), (b'w', b'a'), (b'w', b'd'), (IN_FIRE,))
+    t0 = time.perf_counter()
+    for _ in range(int(seconds/tick_dt)):
+        for c in bots:
+            c.tick(() if c.spectator else moves[rng.randrange(len(moves))])
+        srv.poll(); srv.tick()
+    el = time.perf_counter() - t0
+    st = srv.stats()
+    players = [c for c in bots if not c.spectator]
+    st.update({"ticks": srv.ticks, "wall_s": el,
+               "bytes_in_per_client_s": float(np.mean([c.bytes_in for c in bots]))/(srv.ticks*tick_dt),
+               "bytes_out_per_client_s": float(np.mean([c.bytes_out for c in bots]))/(srv.ticks*tick_dt),
+               "mispredicted_per_snapshot": sum(c.mispredicted for c in players)/max(1, sum(c.snapshots for c in players))})
+    for c in bots: c.close()
+    srv.sock.close()
+    return st
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sv = sub.add_parser("serve"); sv.add_argument("--host", default="127.0.0.1"); sv.add_argument("--port", type=int, default=PORT)
+    sv.add_argument("--map")
+    bn = sub.add_parser("bench"); bn.add_argument("--matches", type=int, default=16)
+    bn.add_argument("--spectators", type=int, default=1, help="per match, besides the player")
+    bn.add_argument("--seconds", type=float, default=10.0, help="simulated seconds")
+    bn.add_argument("--loss", type=float, default=0.0, help="fraction of datagrams dropped, both ways")
+    for p in (sv, bn): p.add_argument("--snapshot-every", type=int, default=SNAPSHOT_EVERY)
+    a = ap.parse_args()
+    SNAPSHOT_EVERY = a.snapshot_every
+    if a.cmd == "serve":
+        srv = Server(a.host, a.port, game_map=load_map(a.map) if a.map else None)
+        print(f"serving on {srv.addr[0]}:{srv.addr[1]}", flush=True)
+        srv.serve()
+    else:
+        for k, v in bench(a.matches, a.spectators, a.seconds, a.loss).items(): print(f"{k:<28} {v:g}")
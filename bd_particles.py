@@ -0,0 +1,53 @@
+"""Particle effects: every emitter's particles live in one preallocated pool, integrated and drawn in batch."""
+import numpy as np
+from bd_entities import EntityPool
+
+MAX_PARTICLES = 8192
+
+class Emitter:
+    """Burst recipe. Particles leave along heading_deg +- spread_deg (cos/sin convention) at a
+    speed in `speed`, with upward vz, spin rv and box size (sx, sy, sz) drawn from the given ranges.
+    `shrink` scales a particle down to nothing over its life; `gravity` multiplies the pool's."""
+    def __init__(self, count, speed, vz, spread_deg=180.0, life=(0.7, 0.7), size=((7, 14), (12, 24), (5, 10)),
+                 spin=(-360, 360), rgb=(0.9, 0.9, 1.0), gravity=1.0, shrink=False):
+        self.count, self.speed, self.vz, self.spread_deg = count, speed, vz, spread_deg
+        self.life, self.size, self.spin, self.rgb = life, size, spin, rgb
+        self.gravity, self.shrink = gravity, shrink
+
+class Particles(EntityPool):
+    """Fixed-capacity particle pool; emit() drops what does not fit rather than growing."""
+    FIELDS = ("x", "y", "z", "vx", "vy", "vz", "rot", "rv", "sx", "sy", "sz",
+              "r", "g", "b", "t0", "life", "grav", "shrink")
+
+    def __init__(self, capacity=MAX_PARTICLES, seed=None):
+        super().__init__(self.FIELDS, capacity, prev=("x", "y", "z", "rot"))
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+
+    def emit(self, em, x, y, z, heading_deg, now):
+        """One burst of `em`, or one per position when x and y are arrays."""
+        x = np.atleast_1d(np.asarray(x, float)); y = np.atleast_1d(np.asarray(y, float))
+        k = min(em.count*len(x), self.capacity - self.n)
+        if k <= 0: return
+        x = np.repeat(x, em.count)[:k]; y = np.repeat(y, em.count)[:k]
+        g = self.rng
+        ang = np.radians(heading_deg + g.uniform(-em.spread_deg, em.spread_deg, k))
+        spd = g.uniform(*em.speed, k)
+        (sx0, sx1), (sy0, sy1), (sz0, sz1) = em.size
+        self.add_many(k, x=x, y=y, z=z, vx=spd*np.cos(ang), vy=spd*np.sin(ang), vz=g.uniform(*em.vz, k),
+                      rot=g.uniform(0, 360, k), rv=g.uniform(*em.spin, k),
+                      sx=g.uniform(sx0, sx1, k), sy=g.uniform(sy0, sy1, k), sz=g.uniform(sz0, sz1, k),
+                      r=em.rgb[0], g=em.rgb[1], b=em.rgb[2], t0=now, life=g.uniform(*em.life, k),
+                      grav=em.gravity, shrink=float(em.shrink))
+
+    def update(self, dt, now, gravity):
+        if not self.n: return
+        self.compact(now - self.t0 <= self.life)
+        self.x[:] += self.vx*dt; self.y[:] += self.vy*dt; self.z[:] += self.vz*dt
+        self.vz[:] += self.grav*(gravity*dt)
+        self.rot[:] += self.rv*dt
+
+    def scale(self, now):
+        """Per-particle size factor: 1, or fading linearly to 0 over life for shrinking emitters."""
+        f = np.clip(1.0 - (now - self.t0)/np.maximum(self.life, 1e-6), 0.0, 1.0)
+        return np.where(self.shrink > 0, f, 1.0)
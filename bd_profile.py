@@ -0,0 +1,68 @@
+"""Frame profiler: named scopes summed per frame into a ring buffer, with percentiles and dumps.
+
+Disabled by default; a disabled scope() hands back a shared no-op context manager, so the
+instrumented code pays one method call per scope.
+"""
+import csv, json, time
+from collections import deque
+
+class _NullScope:
+    def __enter__(self): return self
+    def __exit__(self, *exc): return False
+
+_NULL = _NullScope()
+
+class _Scope:
+    __slots__ = ("prof", "name", "t0")
+    def __init__(self, prof, name): self.prof = prof; self.name = name
+    def __enter__(self): self.t0 = time.perf_counter(); return self
+    def __exit__(self, *exc):
+        cur = self.prof._cur
+        cur[self.name] = cur.get(self.name, 0.0) + time.perf_counter() - self.t0
+        return False
+
+class Profiler:
+    def __init__(self, frames=600):
+        self.enabled = False
+        self.frames = deque(maxlen=frames)
+        self._cur = {}
+        self._order = {}
+
+    def scope(self, name):
+        return _Scope(self, name) if self.enabled else _NULL
+
+    def end_frame(self):
+        """Close the current frame's timings and push them onto the ring buffer."""
+        if not self.enabled: return
+        if self._cur:
+            for name in self._cur: self._order.setdefault(name, len(self._order))
+            self.frames.append(self._cur)
+        self._cur = {}
+
+    def phases(self): return sorted(self._order, key=self._order.get)
+
+    def stats(self):
+        """{phase: (p50_ms, p99_ms, mean_ms)} over the buffered frames; absent counts as 0."""
+        out = {}
+        n = len(self.frames)
+        if not n: return out
+        for name in self.phases():
+            v = sorted(f.get(name, 0.0)*1000.0 for f in self.frames)
+            out[name] = (v[n//2], v[min(n-1, int(n*0.99))], sum(v)/n)
+        return out
+
+    def dump_csv(self, path):
+        names = self.phases()
+        with open(path, "w", newline="") as fh:
+            w = csv.writer(fh)
+            w.writerow(["frame"] + [f"{n}_ms" for n in names])
+            for i, f in enumerate(self.frames):
+                w.writerow([i] + [f"{f.get(n, 0.0)*1000.0:.4f}" for n in names])
+
+    def dump_json(self, path):
+        with open(path, "w") as fh:
+            json.dump({"frames": len(self.frames),
+                       "stats_ms": {k: {"p50": a, "p99": b, "mean": c} for k, (a, b, c) in self.stats().items()},
+                       "samples_ms": [{k: v*1000.0 for k, v in f.items()} for f in self.frames]}, fh, indent=1)
+
+profiler = Profiler()
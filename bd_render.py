@@ -0,0 +1,273 @@
+"""Renderer backends behind one interface.
+
+The front end describes a frame as a Scene: camera matrices plus, per model, the (n, 4, 4)
+instance transforms computed in NumPy. A backend turns that into GL:
+
+    LegacyRenderer  fixed-function: display lists of GLU/GLUT primitives, one matrix push per
+                    instance, vertex arrays for Mesh models
+    CoreRenderer    GL 3.3 core: one shader, a VAO per model, the camera in a uniform buffer and
+                    one instanced draw per model, so draw calls do not grow with entity count
+
+Models are {name: parts or Mesh}, where parts are (shape, args, rgb, ops) tuples; ops are
+("t", x, y, z), ("r", deg, x, y, z) and ("s", x, y, z), applied like glTranslatef/glRotatef/glScalef.
+Shapes: cube (size), sphere (r, slices, stacks), solid_sphere (r, slices, stacks), cone (r, h, slices),
+disk (inner, outer, slices) and tris (list of ((x, y), (x, y), (x, y)) in the z = 0 plane).
+"""
+import ctypes
+from OpenGL.GL import *
+from OpenGL.GLU import *
+from OpenGL.GLUT import *
+import numpy as np
+from bd_mesh import Mesh, sphere_mesh, cone_mesh, disk_mesh, cube_mesh, translate, rotate, scale
+
+class Scene:
+    """One frame: proj/view matrices and, in submission order, (model, mats, tints) items."""
+    def __init__(self, proj, view):
+        self.proj, self.view = proj, view
+        self.items = []
+
+    def add(self, name, mats, tints=None):
+        if len(mats): self.items.append((name, np.asarray(mats, np.float32), tints))
+
+def _ops_matrix(ops):
+    m = np.eye(4)
+    for op, *a in ops:
+        m = m @ {"t": translate, "r": rotate, "s": scale}[op](*a)
+    return m
+
+def part_mesh(shape, args, rgb):
+    if shape == "cube": return cube_mesh(args[0], rgb)
+    if shape in ("sphere", "solid_sphere"): return sphere_mesh(*args, rgb)
+    if shape == "cone": return cone_mesh(args[0], args[1], args[2], rgb)
+    if shape == "disk": return disk_mesh(*args, rgb)
+    if shape == "tris":
+        v = np.array([(x, y, 0.0) for t in args for x, y in t]).reshape(-1, 3)
+        return Mesh(v, np.arange(len(v)), np.tile(rgb, (len(v), 1)))
+    raise ValueError(shape)
+
+def model_mesh(model):
+    """A model as one Mesh: parts are tessellated and transformed on the CPU, then merged."""
+    if isinstance(model, Mesh): return model
+    return Mesh.merge(*[part_mesh(shape, args, rgb).transformed(_ops_matrix(ops)) for shape, args, rgb, ops in model])
+
+def _gl_mat(m): return np.ascontiguousarray(np.asarray(m, np.float32).T)
+
+class LegacyRenderer:
+    """The fixed-function path the game has always used; needs a compatibility context."""
+    name = "legacy"
+
+    def __init__(self, models):
+        self._q = gluNewQuadric()
+        self.lists, self.meshes = {}, {}
+        for name, model in models.items():
+            if isinstance(model, Mesh): self.meshes[name] = model; continue
+            lid = glGenLists(1)
+            glNewList(lid, GL_COMPILE)
+            for part in model: self._part(*part)
+            glEndList()
+            self.lists[name] = lid
+        self.draw_calls = 0
+
+    def _part(self, shape, args, rgb, ops):
+        glPushMatrix()
+        for op, *a in ops:
+            {"t": glTranslatef, "r": glRotatef, "s": glScalef}[op](*a)
+        glColor3f(*rgb)
+        if shape == "cube": glutSolidCube(args[0])
+        elif shape == "sphere": gluSphere(self._q, *args)
+        elif shape == "solid_sphere": glutSolidSphere(*args)
+        elif shape == "cone": gluCylinder(self._q, 0.0, args[0], args[1], args[2], 1)
+        elif shape == "disk": gluDisk(self._q, args[0], args[1], args[2], 1)
+        elif shape == "tris":
+            glBegin(GL_TRIANGLES)
+            for tri in args:
+                for x, y in tri: glVertex3f(x, y, 0)
+            glEnd()
+        glPopMatrix()
+
+    def draw(self, scene, w, h):
+        glViewport(0, 0, w, h)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glEnable(GL_DEPTH_TEST)
+        glMatrixMode(GL_PROJECTION); glLoadMatrixf(_gl_mat(scene.proj))
+        glMatrixMode(GL_MODELVIEW); glLoadMatrixf(_gl_mat(scene.view))
+        calls = 0
+        for name, mats, tints in scene.items:
+            mesh = self.meshes.get(name)
+            if mesh is not None:
+                verts, colors, idx = mesh.batch(mats, tints)
+                glEnableClientState(GL_VERTEX_ARRAY); glEnableClientState(GL_COLOR_ARRAY)
+                glVertexPointer(3, GL_FLOAT, 0, verts); glColorPointer(3, GL_FLOAT, 0, colors)
+                glDrawElements(GL_TRIANGLES, len(idx), GL_UNSIGNED_INT, idx)
+                glDisableClientState(GL_COLOR_ARRAY); glDisableClientState(GL_VERTEX_ARRAY)
+                calls += 1
+                continue
+            lid = self.lists[name]
+            for m in mats:
+                glPushMatrix(); glMultMatrixf(_gl_mat(m)); glCallList(lid); glPopMatrix()
+            calls += len(mats)
+        self.draw_calls = calls
+
+    def draw_text(self, hud, items, w, h):
+        hud.draw(items, w, h)
+        self.draw_calls += 1
+
+# —— core profile
+_VERT = """#version 330 core
+layout(std140) uniform Camera { mat4 view_proj; };
+layout(location = 0) in vec3 pos;
+layout(location = 1) in vec3 color;
+layout(location = 2) in mat4 model;
+layout(location = 6) in vec3 tint;
+out vec3 v_color;
+void main() { gl_Position = view_proj * model * vec4(pos, 1.0); v_color = color * tint; }
+"""
+_FRAG = """#version 330 core
+in vec3 v_color;
+out vec4 frag;
+void main() { frag = vec4(v_color, 1.0); }
+"""
+_TEXT_VERT = """#version 330 core
+uniform vec2 screen;
+layout(location = 0) in vec2 pos;
+layout(location = 1) in vec2 uv;
+layout(location = 2) in vec3 color;
+out vec2 v_uv; out vec3 v_color;
+void main() { gl_Position = vec4(pos / screen * 2.0 - 1.0, 0.0, 1.0); v_uv = uv; v_color = color; }
+"""
+_TEXT_FRAG = """#version 330 core
+uniform sampler2D atlas;
+in vec2 v_uv; in vec3 v_color;
+out vec4 frag;
+void main() { frag = vec4(v_color, texture(atlas, v_uv).r); }
+"""
+_INST_FLOATS = 19                   # mat4 (column-major) + tint
+
+def _program(vs, fs):
+    prog = glCreateProgram()
+    for kind, src in ((GL_VERTEX_SHADER, vs), (GL_FRAGMENT_SHADER, fs)):
+        sh = glCreateShader(kind); glShaderSource(sh, src); glCompileShader(sh)
+        if not glGetShaderiv(sh, GL_COMPILE_STATUS): raise RuntimeError(glGetShaderInfoLog(sh).decode())
+        glAttachShader(prog, sh); glDeleteShader(sh)
+    glLinkProgram(prog)
+    if not glGetProgramiv(prog, GL_LINK_STATUS): raise RuntimeError(glGetProgramInfoLog(prog).decode())
+    return prog
+
+def _buffer(target, data, usage=GL_STATIC_DRAW):
+    b = glGenBuffers(1); glBindBuffer(target, b); glBufferData(target, data.nbytes, data, usage)
+    return b
+
+def core_available():
+    """True when the current context can compile #version 330 core shaders."""
+    try: major, minor = map(int, glGetString(GL_SHADING_LANGUAGE_VERSION).decode().split()[0].split(".")[:2])
+    except Exception: return False
+    return (major, minor) >= (3, 30)
+
+class CoreRenderer:
+    """Shaders, VAOs and a camera uniform buffer; every Scene item becomes one instanced draw."""
+    name = "core"
+
+    def __init__(self, models):
+        self.prog = _program(_VERT, _FRAG)
+        self.ubo = glGenBuffers(1)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo); glBufferData(GL_UNIFORM_BUFFER, 64, None, GL_DYNAMIC_DRAW)
+        glUniformBlockBinding(self.prog, glGetUniformBlockIndex(self.prog, "Camera"), 0)
+        glBindBufferBase(GL_UNIFORM_BUFFER, 0, self.ubo)
+        self.inst = glGenBuffers(1); self._inst_cap = 0
+        self.models = {}
+        for name, model in models.items():
+            mesh = model_mesh(model)
+            vao = glGenVertexArrays(1); glBindVertexArray(vao)
+            _buffer(GL_ARRAY_BUFFER, np.ascontiguousarray(mesh.verts, np.float32))
+            glEnableVertexAttribArray(0); glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 0, None)
+            _buffer(GL_ARRAY_BUFFER, np.ascontiguousarray(mesh.colors, np.float32))
+            glEnableVertexAttribArray(1); glVertexAttribPointer(1, 3, GL_FLOAT, GL_FALSE, 0, None)
+            _buffer(GL_ELEMENT_ARRAY_BUFFER, np.ascontiguousarray(mesh.idx, np.uint32))
+            for loc in range(2, 7):
+                glEnableVertexAttribArray(loc); glVertexAttribDivisor(loc, 1)
+            self.models[name] = (vao, len(mesh.idx))
+        glBindVertexArray(0)
+
+        self.text_prog = _program(_TEXT_VERT, _TEXT_FRAG)
+        self.text_vao = glGenVertexArrays(1); self.text_vbo = glGenBuffers(3); self.text_ibo = glGenBuffers(1)
+        self._text_tex = {}; self._quad_idx = np.zeros(0, np.uint32)
+        self.draw_calls = 0
+
+    def _upload_instances(self, data):
+        glBindBuffer(GL_ARRAY_BUFFER, self.inst)
+        if data.nbytes > self._inst_cap: self._inst_cap = max(data.nbytes, 2*self._inst_cap)
+        glBufferData(GL_ARRAY_BUFFER, self._inst_cap, None, GL_STREAM_DRAW)   # orphans last frame's storage
+        glBufferSubData(GL_ARRAY_BUFFER, 0, data.nbytes, data)
+
+    def draw(self, scene, w, h):
+        glViewport(0, 0, w, h)
+        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+        glEnable(GL_DEPTH_TEST)
+        glUseProgram(self.prog)
+        glBindBuffer(GL_UNIFORM_BUFFER, self.ubo)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, 64, _gl_mat(scene.proj @ scene.view))
+        items = scene.items
+        if not items: self.draw_calls = 0; return
+        # every instance of every item in one upload: transposed (column-major) matrix, then tint
+        n = sum(len(m) for _, m, _ in items)
+        data = np.empty((n, _INST_FLOATS), np.float32)
+        base = 0
+        for _, mats, tints in items:
+            k = len(mats)
+            data[base:base+k, :16] = mats.transpose(0, 2, 1).reshape(k, 16)
+            data[base:base+k, 16:] = 1.0 if tints is None else tints
+            base += k
+        self._upload_instances(data)
+        stride = _INST_FLOATS*4
+        base = 0
+        for name, mats, _ in items:
+            vao, count = self.models[name]
+            glBindVertexArray(vao)
+            for c in range(4):
+                glVertexAttribPointer(2 + c, 4, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(base*stride + 16*c))
+            glVertexAttribPointer(6, 3, GL_FLOAT, GL_FALSE, stride, ctypes.c_void_p(base*stride + 64))
+            glDrawElementsInstanced(GL_TRIANGLES, count, GL_UNSIGNED_INT, None, len(mats))
+            base += len(mats)
+        glBindVertexArray(0)
+        self.draw_calls = len(items)
+
+    def _atlas_texture(self, atlas):
+        tex = self._text_tex.get(id(atlas))
+        if tex is None:
+            tex = self._text_tex[id(atlas)] = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, tex)
+            glPixelStorei(GL_UNPACK_ALIGNMENT, 1)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glTexImage2D(GL_TEXTURE_2D, 0, GL_R8, atlas.tex_w, atlas.tex_h, 0, GL_RED, GL_UNSIGNED_BYTE, atlas.alpha)
+        return tex
+
+    def draw_text(self, hud, items, w, h):
+        """HudText's cached quads as indexed triangles through the text shader."""
+        arrays = hud.arrays(items)
+        if arrays is None: return
+        pos, uv, col = arrays
+        nq = len(pos) // 4
+        glBindVertexArray(self.text_vao)
+        if len(self._quad_idx) < 6*nq:            # quad -> two triangles, grown like Mesh._indices
+            q = 4*np.arange(max(nq, 2*len(self._quad_idx)//6), dtype=np.uint32)[:, None]
+            self._quad_idx = (q + np.array([0, 1, 2, 0, 2, 3], np.uint32)).ravel()
+            glBindBuffer(GL_ELEMENT_ARRAY_BUFFER, self.text_ibo)
+            glBufferData(GL_ELEMENT_ARRAY_BUFFER, self._quad_idx.nbytes, self._quad_idx, GL_STATIC_DRAW)
+        for loc, (vbo, arr) in enumerate(zip(self.text_vbo, (pos, uv, col))):
+            glBindBuffer(GL_ARRAY_BUFFER, vbo); glBufferData(GL_ARRAY_BUFFER, arr.nbytes, arr, GL_STREAM_DRAW)
+            glEnableVertexAttribArray(loc); glVertexAttribPointer(loc, arr.shape[1], GL_FLOAT, GL_FALSE, 0, None)
+        glUseProgram(self.text_prog)
+        glUniform2f(glGetUniformLocation(self.text_prog, "screen"), w, h)
+        glActiveTexture(GL_TEXTURE0); glBindTexture(GL_TEXTURE_2D, self._atlas_texture(hud.atlas))
+        glUniform1i(glGetUniformLocation(self.text_prog, "atlas"), 0)
+        glDisable(GL_DEPTH_TEST); glEnable(GL_BLEND); glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        glDrawElements(GL_TRIANGLES, 6*nq, GL_UNSIGNED_INT, None)
+        glDisable(GL_BLEND); glEnable(GL_DEPTH_TEST)
+        glBindVertexArray(0); glUseProgram(0)
+        self.draw_calls += 1
+
+def make_renderer(kind, models):
+    """kind 'legacy', 'core' or 'auto' (core when the context supports GLSL 3.30)."""
+    if kind == "auto": kind = "core" if core_available() else "legacy"
+    return CoreRenderer(models) if kind == "core" else LegacyRenderer(models)
@@ -0,0 +1,111 @@
+"""Session recording and replay: the seed plus every tick's inputs, fed back through World.step().
+
+The simulation only reads time from its ManualClock and randomness from its seeded rng, so
+(seed, tick_dt, inputs per tick) reproduces a session exactly. File layout, little-endian:
+
+    header  b"BDRP" u8 version  i64 seed  f64 tick_dt  8s map hash
+    record  u32 tick  u8 code        one per input, in order; code END closes the file
+
+Movement codes (w, s, a, d) mean the key was held during that tick; the others are presses.
+Version 1 files, where each movement code was one fixed-size step, are refused; version 2 files
+have no map hash and replay on whatever map is given.
+
+    python bd_replay.py session.bdr [--map PATH]     # replay headless at full speed, print ticks/s and a state digest
+"""
+import argparse, hashlib, struct, time
+import numpy as np
+from bd_map import BD_MAP, load_map
+from bd_sim import World, IN_FIRE, IN_VIEW
+
+MAGIC, VERSION = b"BDRP", 3
+_HEADER = struct.Struct("<4sBqd")
+_MAP_HASH = struct.Struct("8s")
+_RECORD = struct.Struct("<IB")
+CODES = (b'w', b's', b'a', b'd', b'r', IN_FIRE, IN_VIEW)
+_CODE = {k: i for i, k in enumerate(CODES)}
+END = 255
+
+def map_hash(game_map=None):
+    """8 bytes identifying a map's rings, so a replay can tell it is on the one it was recorded on."""
+    h = hashlib.sha1()
+    for r in (game_map if game_map is not None else BD_MAP).rings: h.update(np.array(r, float).tobytes())
+    return h.digest()[:_MAP_HASH.size]
+
+class Recorder:
+    """Appends each tick's inputs to path; call tick() once per World.step(), close() at exit."""
+    def __init__(self, path, seed, tick_dt, game_map=None):
+        self.fh = open(path, "wb")
+        self.fh.write(_HEADER.pack(MAGIC, VERSION, seed, tick_dt) + _MAP_HASH.pack(map_hash(game_map)))
+        self.t = 0
+
+    def tick(self, inputs):
+        for k in inputs:
+            c = _CODE.get(k)
+            if c is not None: self.fh.write(_RECORD.pack(self.t, c))
+        self.t += 1
+
+    def close(self):
+        if self.fh.closed: return
+        self.fh.write(_RECORD.pack(self.t, END))
+        self.fh.close()
+
+class Replay:
+    """A loaded recording; next() hands out one tick's inputs at a time."""
+    def __init__(self, path):
+        with open(path, "rb") as fh: data = fh.read()
+        magic, ver, self.seed, self.tick_dt = _HEADER.unpack_from(data)
+        if magic != MAGIC or ver not in (2, VERSION): raise ValueError(f"{path}: not a v2 or v{VERSION} recording")
+        off = _HEADER.size
+        self.map_hash = None
+        if ver >= 3: self.map_hash, = _MAP_HASH.unpack_from(data, off); off += _MAP_HASH.size
+        self.path = path
+        self.ticks = None
+        events = {}
+        for t, c in _RECORD.iter_unpack(data[off:]):
+            if c == END: self.ticks = t; break
+            events.setdefault(t, []).append(CODES[c])
+        if self.ticks is None: self.ticks = max(events, default=-1) + 1   # recorder never closed
+        self.events = events
+        self.t = 0
+
+    @property
+    def done(self): return self.t >= self.ticks
+
+    def world(self, game_map=None):
+        """A fresh World for this recording on game_map (default BD_MAP); raises ValueError if the
+        recording names a different map."""
+        if self.map_hash is not None and self.map_hash != map_hash(game_map):
+            raise ValueError(f"{self.path}: recorded on a different map")
+        return World(seed=self.seed, game_map=game_map)
+
+    def next(self):
+        ks = self.events.get(self.t, ())
+        self.t += 1
+        return ks
+
+def digest(world):
+    """Short hash of the simulation state, for comparing two runs of the same recording."""
+    h = hashlib.sha1()
+    h.update(struct.pack("<3d", world.px, world.py, world.yaw_deg))
+    h.update(struct.pack("<2d", world.has_x, world.has_y))
+    h.update(struct.pack("<5i", world.lives, world.ammo, world.sword_uses, world.rab_kills_for_upgrade,
+                         world.game_over + 2*world.win))
+    for pool in (world.rabs, world.bullets):
+        h.update(pool.x.tobytes()); h.update(pool.y.tobytes())
+    return h.hexdigest()[:16]
+
+def run(rp, game_map=None):
+    """Replay rp headless on game_map as fast as possible; returns (world, seconds)."""
+    w = rp.world(game_map)
+    t0 = time.perf_counter()
+    while not rp.done: w.step(rp.tick_dt, rp.next())
+    return w, time.perf_counter() - t0
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("replay"); ap.add_argument("--map", help="the map the session was recorded on")
+    a = ap.parse_args()
+    rp = Replay(a.replay)
+    w, el = run(rp, load_map(a.map) if a.map else None)
+    n = rp.ticks
+    print(f"{n} ticks in {el:.3f}s ({n/max(el, 1e-9):,.0f} ticks/s)  digest {digest(w)}")
@@ -0,0 +1,401 @@
+"""Game rules without OpenGL: a World advanced by step(dt, inputs) on an injectable clock."""
+import math, random
+import numpy as np
+from bd_map import BD_MAP, MAP_SCALE, segment_circle_t
+from bd_entities import EntityPool
+from bd_spatial import SpatialHash
+from bd_flow import FlowField
+from bd_particles import Particles, Emitter
+from bd_profile import profiler
+
+MOVE_SPEED, TURN_SPEED = 480.0, 135.0   # units/s and deg/s while a movement key is held
+PLAYER_R = 44.0
+
+def fwd(deg):    a = math.radians(deg); return -math.sin(a), math.cos(a)
+def rightv(deg): a = math.radians(deg); return  math.cos(a), math.sin(a)
+
+WEAPON_SWORD = "sword"
+WEAPON_GUN   = "gun"
+
+# —— sword / melee
+SWORD_SWINGS = 5
+SWING_TIME = 0.28
+SWING_ARC_DEG = 105.0
+SWING_RANGE = 220.0
+SWING_COOLDOWN = 0.10
+
+BREAK_FX_DUR = 0.7
+BREAK_SHARDS = 18
+GRAVITY_Z = -260.0
+
+# —— gun
+GUN_AMMO_INIT = 5
+AMMO_PACK = 5
+GUN_BULLET_SPEED = 920.0
+GUN_BULLET_RADIUS = 10.0
+GUN_BULLET_TTL = 2.2
+
+N_RABS = 10
+RAB_R = 40.0
+STEP_PER_SWING_RAB = 48.0
+STEP_PER_SHOT_RAB  = STEP_PER_SWING_RAB
+RAB_SLOW_SPEED = 6.0
+RAB_GRID_CELL = 128.0
+
+HAS_START = (200.0*MAP_SCALE/3.2, -120.0*MAP_SCALE/3.2)
+HAS_R_BODY = 54.0
+HAS_R_HEAD = 26.0
+STEP_PER_SWING_HAS = 48.0
+STEP_PER_SHOT_HAS  = STEP_PER_SWING_HAS
+
+LIVES = 5
+
+# —— particle effects
+BREAK_FX = Emitter(BREAK_SHARDS, (200, 340), (160, 280), 70, life=(BREAK_FX_DUR, BREAK_FX_DUR))
+MUZZLE_FX = Emitter(12, (80, 260), (-40, 60), 16, life=(0.06, 0.14), size=((3, 6), (3, 6), (3, 6)),
+                    rgb=(1.0, 0.85, 0.3), gravity=0.0, shrink=True)
+SPARK_FX = Emitter(16, (120, 320), (40, 220), 180, life=(0.15, 0.35), size=((2, 4), (2, 4), (2, 4)),
+                   rgb=(1.0, 0.6, 0.2), shrink=True)
+DEATH_FX = Emitter(40, (60, 220), (120, 320), 180, life=(0.4, 0.8), size=((5, 10), (5, 10), (5, 10)),
+                   rgb=(0.35, 0.08, 0.08), shrink=True)
+
+# —— inputs accepted by World.apply_input() besides the movement keys
+IN_FIRE = "fire"
+IN_VIEW = "view"
+
+class ManualClock:
+    """Virtual clock that only moves when the simulation says so."""
+    def __init__(self, t=0.0): self.t = t
+    def __call__(self): return self.t
+    def advance(self, dt): self.t += dt
+
+class World:
+    def __init__(self, seed=None, clock=None, game_map=None, flow_retarget_cells=1):
+        self.map = game_map if game_map is not None else BD_MAP
+        self.rng = random.Random(seed)
+        self.clock = clock if clock is not None else ManualClock()
+        self._last_swing_end = -math.inf
+        self.rabs = EntityPool(("x", "y", "phase"), prev=("x", "y"))
+        self.bullets = EntityPool(("x", "y", "z", "dx", "dy", "t0"), prev=("x", "y"))
+        self.rab_grid = SpatialHash(RAB_GRID_CELL)
+        self.flow = FlowField(self.map, retarget_cells=flow_retarget_cells)
+        self.particles = Particles(seed=self.rng.getrandbits(63))
+        self.reset(has_start=True)
+
+    def reset(self, has_start=False):
+        """New round: the player at the origin, or anywhere on land if it is water; Hasina at
+        HAS_START on the first round (when that is on land), at a random spot after a restart."""
+        self.px, self.py, self.yaw_deg = 0.0, 0.0, 0.0
+        if not self.map.contains(self.px, self.py): self.px, self.py = self.map.sample(self.rng)
+        self.rabs.clear(); self.ensure_rab_count()
+        self.has_x, self.has_y = self.map.sample(self.rng)
+        if has_start and self.map.contains(*HAS_START): self.has_x, self.has_y = HAS_START
+        self.sword_uses = SWORD_SWINGS; self.sword_pick = None
+        self.weapon = WEAPON_SWORD
+        self.ammo = 0; self.bullets.clear(); self.ammo_pick = None; self.gun_pick = None
+        self.gun_unlocked_once = False; self.rab_kills_for_upgrade = 0; self.gun_pending_spawn = False
+        self.lives = LIVES; self.game_over = False; self.win = False
+        self.first_person = False
+        self.swing_active = False; self.swing_t0 = 0.0
+        self.break_fx_active = False; self.break_fx_t0 = 0.0; self.particles.clear(); self.pending_break = False
+        self.save_prev()
+
+    # —— interpolation between ticks, for rendering at a higher or uneven frame rate
+    def save_prev(self):
+        self.prev_pose = (self.px, self.py, self.yaw_deg, self.has_x, self.has_y)
+        self.rabs.save_prev(); self.bullets.save_prev(); self.particles.save_prev()
+
+    def lerp_player(self, alpha):
+        px, py, yaw, _, _ = self.prev_pose
+        dyaw = (self.yaw_deg - yaw + 180.0) % 360.0 - 180.0
+        return px + (self.px - px)*alpha, py + (self.py - py)*alpha, (yaw + dyaw*alpha) % 360.0
+
+    def lerp_hasina(self, alpha):
+        _, _, _, hx, hy = self.prev_pose
+        return hx + (self.has_x - hx)*alpha, hy + (self.has_y - hy)*alpha
+
+    # —— spawning
+    def spawn_rab(self):
+        x, y = self.map.sample(self.rng)
+        self.rabs.add(x=x, y=y, phase=self.rng.random()*6.283)
+
+    def ensure_rab_count(self):
+        k = N_RABS - len(self.rabs)
+        if k <= 0: return
+        if k == 1: self.spawn_rab(); return
+        xs, ys = self.map.sample_n(k, self.rng)
+        self.rabs.add_many(k, x=xs, y=ys, phase=[self.rng.random()*6.283 for _ in range(k)])
+
+    def pickup_busy(self):
+        return (self.sword_pick is not None) or (self.ammo_pick is not None) or (self.gun_pick is not None)
+
+    def spawn_sword_pick(self):
+        if not self.pickup_busy():
+            x, y = self.map.sample(self.rng); self.sword_pick = {"x": x, "y": y}
+
+    def spawn_gun_pick(self):
+        """Spawn gun upgrade ONLY if you don't already have a gun/ammo and no other pickup is active."""
+        if self.weapon == WEAPON_GUN or self.ammo > 0 or self.gun_unlocked_once:
+            self.gun_pending_spawn = False
+            return
+        if not self.pickup_busy():
+            x, y = self.map.sample(self.rng); self.gun_pick = {"x": x, "y": y}
+            self.gun_pending_spawn = False
+        else:
+            self.gun_pending_spawn = True
+
+    def spawn_ammo_pick(self):
+        if not self.pickup_busy():
+            x, y = self.map.sample(self.rng); self.ammo_pick = {"x": x, "y": y}
+
+    # —— step hops
+    def _rabs_toward_player(self, step):
+        """Move every rab `step` toward the player, sliding along the coast when blocked: straight at it
+        when the line between them is clear, along the flow field when the coast is in the way."""
+        rabs = self.rabs
+        if not rabs: return
+        xs, ys = rabs.x, rabs.y
+        dx, dy = self.px - xs, self.py - ys
+        d = np.maximum(1e-6, np.hypot(dx, dy))
+        ux, uy = dx/d, dy/d
+        blocked = ~self.map.line_clear(xs, ys, self.px, self.py)
+        if blocked.all():
+            ux, uy = self.flow.directions(xs, ys, self.px, self.py)
+        elif blocked.any():
+            ux[blocked], uy[blocked] = self.flow.directions(xs[blocked], ys[blocked], self.px, self.py)
+        xs[:], ys[:] = self.map.sdf.slide(xs + step*ux, ys + step*uy)
+
+    def _hop_all(self, step_rab, step_has):
+        px, py = self.px, self.py
+        self._rabs_toward_player(step_rab)
+        dx, dy = self.has_x - px, self.has_y - py
+        d = max(1e-6, math.hypot(dx, dy))
+        self.has_x, self.has_y = self.map.sdf.slide1(self.has_x + step_has*dx/d, self.has_y + step_has*dy/d)
+
+    def per_swing_steps(self): self._hop_all(STEP_PER_SWING_RAB, STEP_PER_SWING_HAS)
+    def per_shot_steps(self):  self._hop_all(STEP_PER_SHOT_RAB, STEP_PER_SHOT_HAS)
+
+    # —— sword
+    def hand_world_pos(self):
+        """Approximate world position of the weapon hand in TP coordinates."""
+        fx, fy = fwd(self.yaw_deg)
+        return self.px + 62 * fx, self.py + 62 * fy, 124.0
+
+    def trigger_break_fx(self):
+        """Spawn shard particles at the sword hand and start break animation."""
+        self.particles.emit(BREAK_FX, *self.hand_world_pos(), self.yaw_deg, self.clock())
+        self.break_fx_active = True
+        self.break_fx_t0 = self.clock()
+
+    def begin_swing(self):
+        if self.weapon != WEAPON_SWORD: return
+        if self.game_over or self.win or self.swing_active: return
+        if self.sword_uses <= 0: return
+        now = self.clock()
+        if now - self._last_swing_end < SWING_COOLDOWN: return
+        self.swing_active = True
+        self.swing_t0 = now
+        self.sword_uses -= 1
+        if self.sword_uses == 0:
+            self.pending_break = True
+            if not self.pickup_busy():
+                self.spawn_sword_pick()
+        self.per_swing_steps()
+
+    def end_swing(self):
+        self.swing_active = False
+        self._last_swing_end = self.clock()
+        if self.pending_break:
+            self.trigger_break_fx()
+            self.pending_break = False
+
+    def within_arc_and_range(self, tx, ty):
+        fx, fy = fwd(self.yaw_deg)
+        vx, vy = tx - self.px, ty - self.py
+        d = math.hypot(vx, vy)
+        if d > SWING_RANGE: return False
+        cos_th = (fx*vx + fy*vy) / (d + 1e-9)
+        return cos_th >= math.cos(math.radians(SWING_ARC_DEG * 0.5))
+
+    def rabs_in_swing(self):
+        """Indices of rabs inside the sword sweep: one disk around the player, so a direct distance
+        prefilter rather than a grid build, then the arc test on the few left."""
+        near = np.flatnonzero((self.rabs.x - self.px)**2 + (self.rabs.y - self.py)**2 <= SWING_RANGE**2)
+        return near[self.within_arc_and_range_many(self.rabs.x[near], self.rabs.y[near])]
+
+    def within_arc_and_range_many(self, xs, ys):
+        """within_arc_and_range() for coordinate arrays; returns a bool array."""
+        fx, fy = fwd(self.yaw_deg)
+        vx, vy = xs - self.px, ys - self.py
+        d = np.hypot(vx, vy)
+        cos_th = (fx*vx + fy*vy) / (d + 1e-9)
+        return (d <= SWING_RANGE) & (cos_th >= math.cos(math.radians(SWING_ARC_DEG * 0.5)))
+
+    # —— gun
+    def muzzle(self, fp):
+        """Compute muzzle (for gun) based on FP/TP."""
+        fx, fy = fwd(self.yaw_deg)
+        if fp:
+            rx, ry = rightv(self.yaw_deg)
+            gx = self.px + 24*fx + 10*rx; gy = self.py + 24*fy + 10*ry
+            return gx + 30*fx, gy + 30*fy, 88.0, fx, fy
+        return self.px + 62*fx, self.py + 62*fy, 84.0, fx, fy
+
+    def shoot_gun(self):
+        if self.weapon != WEAPON_GUN: return
+        if self.game_over or self.win or self.ammo <= 0: return
+        mx, my, mz, fx, fy = self.muzzle(self.first_person)
+        self.bullets.add(x=mx, y=my, z=mz, dx=fx, dy=fy, t0=self.clock())
+        self.particles.emit(MUZZLE_FX, mx, my, mz, self.yaw_deg + 90.0, self.clock())
+        self.ammo -= 1
+        self.per_shot_steps()
+        if self.ammo == 0 and not self.pickup_busy():
+            self.spawn_ammo_pick()
+
+    # —— input
+    def apply_input(self, k, dt):
+        """b'w', b's', b'a', b'd': that key was held for this dt. b'r', IN_FIRE, IN_VIEW: one press."""
+        if k == b'r': self.reset(); return
+        if k == IN_VIEW: self.first_person = not self.first_person; return
+        if self.game_over or self.win: return
+        if k == IN_FIRE:
+            if self.weapon == WEAPON_SWORD: self.begin_swing()
+            else:                           self.shoot_gun()
+        if k in (b'w', b's'):
+            fx, fy = fwd(self.yaw_deg); s = MOVE_SPEED*dt if k == b'w' else -MOVE_SPEED*dt
+            self.px, self.py = self.map.sdf.slide1(self.px + s*fx, self.py + s*fy)
+        if k == b'a': self.yaw_deg = (self.yaw_deg + TURN_SPEED*dt) % 360.0
+        if k == b'd': self.yaw_deg = (self.yaw_deg - TURN_SPEED*dt) % 360.0
+
+    def step(self, dt, inputs=()):
+        """Apply inputs, advance a ManualClock by dt and run one update; never sleeps."""
+        self.save_prev()
+        for k in inputs: self.apply_input(k, dt)
+        advance = getattr(self.clock, "advance", None)
+        if advance is not None: advance(dt)
+        self.update(dt)
+
+    def update(self, dt):
+        prof = profiler
+        now = self.clock()
+        if self.swing_active and (now - self.swing_t0 >= SWING_TIME):
+            self.end_swing()
+
+        if not (self.game_over or self.win):
+            with prof.scope("update.creep"):
+                if RAB_SLOW_SPEED > 0.0:
+                    self._rabs_toward_player(RAB_SLOW_SPEED * dt)
+            if self.swing_active and self.weapon == WEAPON_SWORD:
+                with prof.scope("update.sword"):
+                    self._update_sword()
+            if self.weapon == WEAPON_GUN and self.bullets:
+                with prof.scope("update.bullets"):
+                    self._update_bullets(dt, now)
+            with prof.scope("update.player_hits"):
+                self._update_player_hits()
+            with prof.scope("update.pickups"):
+                self._update_pickups()
+
+        if self.particles or self.break_fx_active:
+            with prof.scope("update.fx"):
+                self._update_fx(dt, now)
+
+    def _update_sword(self):
+        rabs = self.rabs
+        hit = self.rabs_in_swing()
+        if hit.size:
+            self.rab_kills_for_upgrade += int(hit.size)
+            self.particles.emit(DEATH_FX, rabs.x[hit], rabs.y[hit], RAB_R, 0.0, self.clock())
+            dead = np.zeros(len(rabs), bool); dead[hit] = True
+            rabs.compact(~dead)
+        self.ensure_rab_count()
+        if self.within_arc_and_range(self.has_x, self.has_y):
+            self.win = True
+
+    def _update_bullets(self, dt, now):
+        """Sweep each bullet along this tick's path (x_prev -> x), so no dt lets it skip a target:
+        it stops at the first of a rab, Hasina or the coast that it reaches."""
+        rabs, bullets = self.rabs, self.bullets
+        bullets.x[:] += bullets.dx * (GUN_BULLET_SPEED * dt)
+        bullets.y[:] += bullets.dy * (GUN_BULLET_SPEED * dt)
+        bullets.compact(now - bullets.t0 <= GUN_BULLET_TTL)
+        if not bullets: return
+
+        x0, y0, x1, y1 = bullets.x_prev, bullets.y_prev, bullets.x, bullets.y
+        t_coast = self.map.sdf.exit_t(x0, y0, x1, y1)
+        t_has = segment_circle_t(x0, y0, x1, y1, self.has_x, self.has_y, HAS_R_BODY + GUN_BULLET_RADIUS)
+        t_stop = np.minimum(t_coast, t_has)
+        t_hit = np.full(len(bullets), np.inf)
+        half = 0.5*float(np.hypot(x1 - x0, y1 - y0).max())
+        grid = self.rab_grid.build(rabs.x, rabs.y)
+        bi, ri = grid.query_many(0.5*(x0 + x1), 0.5*(y0 + y1), half + RAB_R + GUN_BULLET_RADIUS)
+        if ri.size:
+            t = segment_circle_t(x0[bi], y0[bi], x1[bi], y1[bi], rabs.x[ri], rabs.y[ri], RAB_R + GUN_BULLET_RADIUS)
+            ok = t < t_stop[bi]
+            bi, ri, t = bi[ok], ri[ok], t[ok]
+        if ri.size:
+            # earliest contacts first: a bullet stops at the first rab on its path, a rab takes the first bullet
+            srt = np.lexsort((ri, bi, t))
+            dead = np.zeros(len(rabs), bool)
+            for b, r, tb in zip(bi[srt].tolist(), ri[srt].tolist(), t[srt].tolist()):
+                if not dead[r] and t_hit[b] == np.inf: t_hit[b] = tb; dead[r] = True
+            self.rab_kills_for_upgrade += int(np.count_nonzero(dead))
+            self.particles.emit(DEATH_FX, rabs.x[dead], rabs.y[dead], RAB_R, 0.0, now)
+            rabs.compact(~dead)
+            self.ensure_rab_count()
+
+        spent = np.isfinite(t_hit)
+        if (~spent & (t_has <= t_coast) & np.isfinite(t_has)).any():
+            self.win = True; bullets.clear(); return
+        stop = np.where(spent, t_hit, t_coast)
+        gone = np.isfinite(stop)
+        if gone.any():
+            tg = stop[gone]
+            self.particles.emit(SPARK_FX, x0[gone] + tg*(x1 - x0)[gone], y0[gone] + tg*(y1 - y0)[gone], 84.0, 0.0, now)
+            bullets.compact(~gone)
+
+    def _update_player_hits(self):
+        rabs = self.rabs
+        touching = np.flatnonzero((rabs.x - self.px)**2 + (rabs.y - self.py)**2 <= (RAB_R + PLAYER_R)**2)
+        if touching.size:
+            i = touching[0]
+            self.lives -= 1
+            rabs.x[i], rabs.y[i] = rabs.x_prev[i], rabs.y_prev[i] = self.map.sample(self.rng)
+            if self.lives <= 0: self.game_over = True
+
+    def _update_pickups(self):
+        px, py = self.px, self.py
+        if (not self.gun_unlocked_once) and (self.weapon == WEAPON_SWORD) and self.rab_kills_for_upgrade >= 10 and self.ammo == 0:
+            self.spawn_gun_pick()
+
+        pick_r2 = (PLAYER_R + 22)**2
+        sp = self.sword_pick
+        if sp is not None:
+            if (sp["x"]-px)**2 + (sp["y"]-py)**2 <= pick_r2 and self.weapon == WEAPON_SWORD:
+                self.sword_pick = None
+                self.sword_uses = SWORD_SWINGS
+
+        gp = self.gun_pick
+        if gp is not None:
+            if self.weapon == WEAPON_GUN or self.ammo > 0:
+                self.gun_pick = None
+            elif (gp["x"]-px)**2 + (gp["y"]-py)**2 <= pick_r2:
+                self.gun_pick = None
+                self.gun_unlocked_once = True
+                self.weapon = WEAPON_GUN
+                self.ammo = GUN_AMMO_INIT
+
+        ap = self.ammo_pick
+        if ap is not None and self.weapon == WEAPON_GUN:
+            if (ap["x"]-px)**2 + (ap["y"]-py)**2 <= pick_r2:
+                self.ammo_pick = None
+                self.ammo += AMMO_PACK
+
+        if (self.gun_pending_spawn and not self.pickup_busy() and self.weapon == WEAPON_SWORD
+                and self.ammo == 0 and not self.gun_unlocked_once):
+            self.spawn_gun_pick()
+
+    def _update_fx(self, dt, now):
+        if self.break_fx_active and now - self.break_fx_t0 > BREAK_FX_DUR:
+            self.break_fx_active = False
+        self.particles.update(dt, now, GRAVITY_Z)
@@ -0,0 +1,48 @@
+import math
+import numpy as np
+
+_OFF = 1 << 20
+
+def _keys(cx, cy): return (cx + _OFF) * (1 << 32) + (cy + _OFF)
+
+class SpatialHash:
+    """Uniform-grid broadphase over a set of points, rebuilt with build() whenever they move.
+
+    Points are bucketed by cell key and sorted once, so a query touches only the cells
+    overlapping its disk; query_many() answers any number of disks in one vectorized pass.
+    """
+    def __init__(self, cell):
+        self.cell = float(cell)
+        self.xs = self.ys = np.zeros(0)
+        self._keys = np.zeros(0, np.int64); self._order = np.zeros(0, np.intp)
+
+    def build(self, xs, ys):
+        self.xs = np.asarray(xs, float); self.ys = np.asarray(ys, float)
+        keys = _keys(np.floor(self.xs / self.cell).astype(np.int64), np.floor(self.ys / self.cell).astype(np.int64))
+        self._order = np.argsort(keys, kind="stable")
+        self._keys = keys[self._order]
+        return self
+
+    def query_many(self, qx, qy, r):
+        """(query index, point index) pairs with distance <= r, grouped by query."""
+        qx = np.atleast_1d(np.asarray(qx, float)); qy = np.atleast_1d(np.asarray(qy, float))
+        empty = np.zeros(0, np.intp)
+        if not len(self._keys) or not len(qx): return empty, empty
+        ring = int(math.ceil(r / self.cell))
+        span = np.arange(-ring, ring + 1)
+        qcx = np.floor(qx / self.cell).astype(np.int64); qcy = np.floor(qy / self.cell).astype(np.int64)
+        k = _keys((qcx[:, None] + span)[:, :, None], (qcy[:, None] + span)[:, None, :]).ravel()
+        lo = np.searchsorted(self._keys, k, "left"); hi = np.searchsorted(self._keys, k, "right")
+        cnt = hi - lo
+        tot = int(cnt.sum())
+        if not tot: return empty, empty
+        q = np.repeat(np.arange(len(k)) // (len(span)**2), cnt)
+        it = self._order[np.repeat(lo - (np.cumsum(cnt) - cnt), cnt) + np.arange(tot)]
+        near = (self.xs[it] - qx[q])**2 + (self.ys[it] - qy[q])**2 <= r*r
+        q, it = q[near], it[near]
+        srt = np.lexsort((it, q))
+        return q[srt], it[srt]
+
+    def query(self, x, y, r):
+        """Indices of points within r of (x, y), ascending."""
+        return self.query_many([x], [y], r)[1]
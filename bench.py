@@ -0,0 +1,171 @@
+"""Benchmarks for the simulation and rendering hot paths; results are saved as JSON for diffing.
+
+    python bench.py                          # simulation only, never imports OpenGL
+    python bench.py --render                 # also time the full display() path in a GLUT window
+    xvfb-run -s "-screen 0 1400x1100x24" python bench.py --render    # same, on a GPU-less box (Mesa llvmpipe)
+    python bench.py --compare old.json       # print speed ratios against an earlier run
+    python bench.py --render --renderer legacy --out legacy.json && python bench.py --render --compare legacy.json
+"""
+import argparse, gc, json, math, platform, sys, time, tracemalloc
+import numpy as np
+import bd_sim
+from bd_map import (BD_MAP, BD_SDF, MAP_MIN_X, MAP_MAX_X, MAP_MIN_Y, MAP_MAX_Y, point_in_poly, points_in_poly,
+                    rand_in_map, rand_in_map_n)
+from bd_sim import World, WEAPON_GUN, LIVES, DEATH_FX
+
+SIZES = (10, 100, 1000, 10000)
+SCENARIOS = ("idle", "bullets", "break_fx", "particles")
+BULLETS_IN_FLIGHT = 200
+PARTICLES_ALIVE = 4000
+TICK = 1.0 / 60.0
+
+def timed(fn, min_time):
+    """Call fn until min_time seconds have passed (at least 3 times); returns calls per second."""
+    fn()
+    reps, t0 = 0, time.perf_counter()
+    while True:
+        fn(); reps += 1
+        el = time.perf_counter() - t0
+        if reps >= 3 and el >= min_time: return reps / el
+
+def allocations(fn, reps):
+    """Peak and retained traced memory plus GC runs while calling fn reps times."""
+    gc_before = sum(s["collections"] for s in gc.get_stats())
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    for _ in range(reps): fn()
+    cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"alloc_peak_kb": round((peak - base)/1024, 1), "alloc_net_kb": round((cur - base)/1024, 1),
+            "gc_collections": sum(s["collections"] for s in gc.get_stats()) - gc_before}
+
+def make_world(n, scenario):
+    bd_sim.N_RABS = n
+    w = World(seed=1)
+    if scenario == "bullets": w.weapon = WEAPON_GUN; w.ammo = 10**9
+    return w
+
+def scenario_tick(w, scenario, g):
+    """One simulation tick of the given scenario, keeping the world in a steady state."""
+    if scenario == "bullets":
+        k = BULLETS_IN_FLIGHT - len(w.bullets)
+        if k > 0:
+            a = g.uniform(0, 2*math.pi, k)
+            w.bullets.add_many(k, x=w.px, y=w.py, z=84.0, dx=np.cos(a), dy=np.sin(a), t0=w.clock())
+    elif scenario == "break_fx" and not w.break_fx_active:
+        w.trigger_break_fx()
+    elif scenario == "particles":
+        while len(w.particles) < PARTICLES_ALIVE:
+            w.particles.emit(DEATH_FX, *g.uniform(-600, 600, 2), 40.0, 0.0, w.clock())
+    w.step(TICK)
+    if w.win or w.game_over: w.win = w.game_over = False; w.lives = LIVES
+
+def bench_geometry(min_time):
+    rng = np.random.default_rng(0)
+    xs = rng.uniform(MAP_MIN_X, MAP_MAX_X, 1000); ys = rng.uniform(MAP_MIN_Y, MAP_MAX_Y, 1000)
+    x0, y0 = float(xs[0]), float(ys[0])
+    import random as _random
+    r = _random.Random(0)
+    rows = [
+        ("point_in_poly", 1, lambda: point_in_poly(x0, y0)),
+        ("points_in_poly", 1000, lambda: points_in_poly(xs, ys)),
+        ("sdf_contains", 1000, lambda: BD_SDF.contains(xs, ys)),
+        ("map_contains", 1000, lambda: BD_MAP.contains_many(xs, ys)),
+        ("rand_in_map", 1, lambda: rand_in_map(r)),
+        ("rand_in_map_n", 1000, lambda: rand_in_map_n(1000, r)),
+    ]
+    out = []
+    for name, per_call, fn in rows:
+        out.append({"bench": name, "points_per_s": round(timed(fn, min_time)*per_call)})
+        print(f"{name:<16} {out[-1]['points_per_s']:>14,} points/s")
+    return out
+
+def bench_sim(sizes, min_time, alloc_reps):
+    out = []
+    for n in sizes:
+        for name in ("per_swing_steps", "per_shot_steps"):
+            w = make_world(n, "idle")
+            rate = timed(getattr(w, name), min_time)
+            out.append({"bench": name, "n_rabs": n, "calls_per_s": round(rate, 1)})
+            print(f"{name:<16} n={n:<6} {rate:>12,.1f} calls/s")
+        for sc in SCENARIOS:
+            w = make_world(n, sc); g = np.random.default_rng(1)
+            tick = lambda: scenario_tick(w, sc, g)
+            for _ in range(30): tick()
+            rate = timed(tick, min_time)
+            row = {"bench": "update", "n_rabs": n, "scenario": sc, "ticks_per_s": round(rate, 1)}
+            row.update(allocations(tick, alloc_reps))
+            out.append(row)
+            print(f"update {sc:<9} n={n:<6} {rate:>12,.1f} ticks/s   peak {row['alloc_peak_kb']} KiB"
+                  f"   gc {row['gc_collections']}")
+    return out
+
+def bench_render(sizes, frames, kind="auto"):
+    from OpenGL.GL import glFinish, glGetString, GL_RENDERER
+    from OpenGL.GLUT import glutMainLoopEvent
+    import HasinaSlayer as game
+    game.TARGET_FPS = 0; game.RENDERER = kind
+    game.world = make_world(sizes[0], "idle")
+    game.retune_camera_for_map()
+    game.init_gl()
+    renderer = glGetString(GL_RENDERER).decode()
+    print(f"renderer: {renderer}, backend {game.renderer.name}")
+    out = []
+    for n in sizes:
+        for sc in SCENARIOS:
+            for fp in (False, True):
+                w = game.world = make_world(n, sc); w.first_person = fp
+                g = np.random.default_rng(1)
+                def frame():
+                    """One scenario tick, untimed, then the render alone: with the accumulator just
+                    emptied, display() steps no catch-up ticks of its own."""
+                    scenario_tick(w, sc, g)
+                    game._acc = 0.0; game._tprev = t0 = time.perf_counter()
+                    game.display(); glutMainLoopEvent(); glFinish()
+                    return time.perf_counter() - t0
+                for _ in range(5): frame()
+                fps = frames / sum(frame() for _ in range(frames))
+                view = "fp" if fp else "tp"
+                out.append({"bench": "display", "n_rabs": n, "scenario": sc, "view": view, "backend": game.renderer.name,
+                            "frames_per_s": round(fps, 2), "culled": game.culled_objects,
+                            "draw_calls": game.renderer.draw_calls})
+                print(f"display {sc:<9} {view} n={n:<6} {fps:>9.2f} frames/s   culled {game.culled_objects}"
+                      f"   draw calls {game.renderer.draw_calls}")
+    return out, renderer
+
+def _key(r): return (r["bench"], r.get("n_rabs"), r.get("scenario"), r.get("view"))
+def _rate(r): return next(v for k, v in r.items() if k.endswith("_per_s"))
+
+def compare(old_path, results):
+    with open(old_path) as fh: old = {_key(r): r for r in json.load(fh)["results"]}
+    print(f"\nvs {old_path} (new/old rate):")
+    for r in results:
+        o = old.get(_key(r))
+        if o is None: continue
+        label = " ".join(str(v) for v in _key(r) if v is not None)
+        print(f"  {label:<34} {_rate(r)/max(_rate(o), 1e-12):6.2f}x")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="N_RABS values")
+    ap.add_argument("--min-time", type=float, default=0.5, help="seconds per timed measurement")
+    ap.add_argument("--alloc-reps", type=int, default=20, help="ticks traced for allocation stats")
+    ap.add_argument("--render", action="store_true", help="also benchmark display() (needs a GL display)")
+    ap.add_argument("--frames", type=int, default=60, help="frames per render measurement")
+    ap.add_argument("--renderer", choices=("auto", "legacy", "core"), default="auto", help="backend for --render")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--compare", metavar="OLD_JSON")
+    a = ap.parse_args(argv)
+
+    meta = {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    results = bench_geometry(a.min_time) + bench_sim(a.sizes, a.min_time, a.alloc_reps)
+    if a.render:
+        rows, meta["gl_renderer"] = bench_render(a.sizes, a.frames, a.renderer)
+        results += rows
+    with open(a.out, "w") as fh: json.dump({"meta": meta, "results": results}, fh, indent=1)
+    print(f"\nwrote {a.out}")
+    if a.compare: compare(a.compare, results)
+
+if __name__ == "__main__":
+    sys.exit(main())
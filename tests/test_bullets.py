@@ -0,0 +1,37 @@
+import math
+from bd_map import BD_POLY
+from bd_sim import World, WEAPON_GUN, IN_FIRE, fwd
+
+DT = 0.25                           # a bullet covers 230 units per tick, far more than a rab's width
+
+def _gunner(x=0.0, y=0.0, yaw=0.0):
+    w = World(1)
+    w.px, w.py, w.yaw_deg = x, y, yaw
+    w.weapon, w.ammo = WEAPON_GUN, 5
+    w.rabs.clear()
+    w.has_x, w.has_y = x - 900.0*fwd(yaw)[0], y - 900.0*fwd(yaw)[1]      # behind the player, out of the way
+    w.save_prev()
+    return w
+
+def test_bullet_hits_rab_between_ticks():
+    w = _gunner()
+    w.rabs.add(x=0.0, y=150.0, phase=0.0)
+    w.step(DT, [IN_FIRE])
+    assert w.rab_kills_for_upgrade == 1 and not w.bullets
+
+def test_bullet_hits_hasina_between_ticks():
+    w = _gunner()
+    w.has_x, w.has_y = 0.0, 150.0
+    w.step(DT, [IN_FIRE])
+    assert w.win
+
+def test_bullet_leaving_the_coast_is_removed_that_tick():
+    (ax, ay), (bx, by) = BD_POLY[0], BD_POLY[1]
+    mx, my = 0.5*(ax + bx), 0.5*(ay + by)
+    nx, ny = by - ay, -(bx - ax); n = math.hypot(nx, ny); nx, ny = nx/n, ny/n
+    w = _gunner()
+    if w.map.contains(mx + 10*nx, my + 10*ny): nx, ny = -nx, -ny            # make (nx, ny) point out to sea
+    w = _gunner(mx - 150*nx, my - 150*ny, math.degrees(math.atan2(-nx, ny)))
+    assert w.map.contains(w.px, w.py)
+    w.step(DT, [IN_FIRE])
+    assert w.ammo == 4 and not w.bullets
@@ -0,0 +1,20 @@
+import numpy as np
+import HasinaSlayer as game
+from bd_mesh import perspective, look_at
+
+def test_frustum_matches_projection():
+    eye, target = (300.0, -900.0, 650.0), (0.0, 0.0, 60.0)
+    game.set_frustum(eye, target)
+    g = np.random.default_rng(0)
+    p = g.uniform(-3000.0, 3000.0, (5000, 3))
+    clip = np.c_[p, np.ones(len(p))] @ (perspective(game.FOVY, game.ASPECT, game.Z_NEAR, game.Z_FAR) @ look_at(eye, target)).T
+    w = clip[:, 3:]
+    inside = (w[:, 0] > 0) & (np.abs(clip[:, :3]) <= w).all(axis=1)
+    got = game.in_frustum_many(p[:, 0], p[:, 1], p[:, 2], 0.0)
+    assert inside.any() and (~inside).any()
+    assert (got == inside).mean() > 0.999          # only points on the boundary may disagree
+
+def test_sphere_radius_widens_frustum():
+    game.set_frustum((0.0, 0.0, 100.0), (0.0, 1000.0, 100.0))
+    assert not game.in_frustum_many(np.array([0.0]), np.array([-50.0]), 100.0, 10.0)[0]
+    assert game.in_frustum_many(np.array([0.0]), np.array([-50.0]), 100.0, 60.0)[0]
@@ -0,0 +1,20 @@
+import numpy as np
+from bd_map import GameMap, SlabIndex, point_in_poly
+from bd_sim import World
+
+OUTER = [(-1000, -800), (900, -1000), (1200, 300), (200, 1100), (-300, 700), (-1100, 900)]
+HOLE = [(-200, -200), (300, -250), (250, 300), (0, 50), (-250, 250)]
+
+def test_slab_index_matches_ray_cast_with_hole():
+    g = np.random.default_rng(0)
+    xs = g.uniform(-1300, 1300, 20000); ys = g.uniform(-1200, 1300, 20000)
+    want = np.array([point_in_poly(x, y, OUTER) and not point_in_poly(x, y, HOLE) for x, y in zip(xs, ys)])
+    assert np.array_equal(SlabIndex([OUTER, HOLE]).contains(xs, ys), want)
+
+def test_reset_spawns_player_on_land():
+    m = GameMap([OUTER, HOLE])
+    assert not m.contains(0.0, 0.0)
+    w = World(1, game_map=m)
+    for _ in range(20):
+        assert m.contains(w.px, w.py)
+        w.step(1.0/60.0, [b'r'])
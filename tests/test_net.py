@@ -0,0 +1,52 @@
+import random
+import numpy as np
+from bd_map import BD_MAP
+from bd_net import Match, NONE, SNAPSHOT_EVERY, key_mask, _pack_section, _unpack_section, unpack_snapshot
+from bd_replay import CODES
+
+def test_section_deltas_wrap_exactly():
+    base = np.array([-30000, 5, 0, 32767], np.int16)
+    cur = np.array([30000, 5, -1, -32768], np.int16)
+    buf = _pack_section(cur, base)
+    out, off = _unpack_section(buf, 0, base)
+    assert off == len(buf) and np.array_equal(out, cur)
+
+def test_snapshots_decode_exactly_under_loss():
+    m = Match(0, 3, BD_MAP); rng = random.Random(5)
+    history, ack, server_ack, received = {}, NONE, NONE, 0
+    for seq in range(1, 1201):
+        m.inputs[seq] = key_mask(k for k in CODES if k != b'r' and rng.random() < 0.2)
+        m.step(1.0/60.0)
+        if m.tick % SNAPSHOT_EVERY: continue
+        m.snapshot()
+        pkt = m.encoded(server_ack, m.applied)
+        if rng.random() < 0.2: continue                  # snapshot lost
+        tick, state, input_seq = unpack_snapshot(pkt, history)
+        assert tick == m.tick and input_seq == m.applied
+        for got, want in zip(state, m.history[tick]): assert np.array_equal(got, want)
+        history[tick] = state; ack = tick; received += 1
+        if rng.random() >= 0.2: server_ack = ack         # else the ack is lost on the way back
+    assert received > 400
+
+def _lossy_session(outage):
+    from bd_net import Server, NetClient, INPUT_HOLD
+    srv = Server(port=0, seed=1)
+    c = NetClient(srv.addr, 0, seed=2).connect(pump=srv.poll)
+    m = srv.matches[0]
+    def run(ticks):
+        for _ in range(ticks):
+            c.tick((b'w',)); srv.poll(); srv.tick()
+            assert len(m.inputs) <= INPUT_HOLD
+    try:
+        run(30)
+        c.loss = 1.0; run(outage)
+        c.loss = 0.0; run(120)
+        return c.seq - m.applied
+    finally:
+        c.close(); srv.sock.close()
+
+def test_inputs_resume_after_a_burst_longer_than_the_window():
+    assert _lossy_session(40) <= 2
+
+def test_inputs_resume_after_the_client_dropped_unacked_ones():
+    assert _lossy_session(200) <= 2
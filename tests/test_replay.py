@@ -0,0 +1,29 @@
+import random
+import pytest
+from bd_map import GameMap
+from bd_replay import Recorder, Replay, digest, run, CODES
+from bd_sim import World
+
+def _record(path, seed, dt, game_map=None, ticks=900):
+    w = World(seed, game_map=game_map); rec = Recorder(path, seed, dt, game_map); rng = random.Random(1)
+    for t in range(ticks):
+        ks = tuple(k for k in CODES if rng.random() < (0.002 if k == b'r' else 0.15))
+        rec.tick(ks); w.step(dt, ks)
+    rec.close()
+    return w
+
+def test_replay_reproduces_digest(tmp_path):
+    path = str(tmp_path / "s.bdr")
+    w = _record(path, 7, 1.0/60.0)
+    rp = Replay(path)
+    assert rp.ticks == 900
+    replayed, _ = run(rp)
+    assert digest(replayed) == digest(w)
+
+def test_replay_needs_the_recorded_map(tmp_path):
+    path = str(tmp_path / "m.bdr")
+    m = GameMap([[(-1500, -1200), (1400, -1300), (1200, 1500), (-1300, 1200)]])
+    w = _record(path, 3, 1.0/60.0, m, ticks=300)
+    with pytest.raises(ValueError): run(Replay(path))
+    replayed, _ = run(Replay(path), GameMap(m.rings))
+    assert digest(replayed) == digest(w)
@@ -0,0 +1,38 @@
+import random
+import numpy as np
+from bd_map import BD_MAP, BD_POLY, PolySampler, alias_table, point_in_poly
+
+def test_alias_table_reproduces_weights():
+    w = [3.0, 0.5, 1.0, 7.25, 0.0, 2.0]
+    prob, alias = alias_table(w)
+    n = len(w)
+    p = np.array(prob)/n
+    for i, a in enumerate(alias): p[a] += (1.0 - prob[i])/n
+    assert np.allclose(p, np.array(w)/sum(w))
+
+TRIS = [((0, 0), (1, 0), (0, 1)), ((2, 0), (5, 0), (2, 1)), ((5, 5), (5, 7), (3, 5))]
+AREAS = np.array([0.5, 1.5, 2.0])
+
+def _triangle_of(xs, ys):
+    """Index of the (disjoint) triangle in TRIS holding each point, -1 for none."""
+    out = np.full(len(xs), -1)
+    for k, (a, b, c) in enumerate(TRIS):
+        d = [(q[0]-p[0])*(ys-p[1]) - (q[1]-p[1])*(xs-p[0]) for p, q in ((a, b), (b, c), (c, a))]
+        inside = ((d[0] >= 0) & (d[1] >= 0) & (d[2] >= 0)) | ((d[0] <= 0) & (d[1] <= 0) & (d[2] <= 0))
+        out[inside] = k
+    return out
+
+def test_triangle_picks_follow_area():
+    s = PolySampler(TRIS)
+    xs, ys = s.sample_n(200000, random.Random(0))
+    rng = random.Random(1)
+    one = np.array([s.sample(rng) for _ in range(50000)])
+    for k, n in ((_triangle_of(xs, ys), 200000), (_triangle_of(one[:, 0], one[:, 1]), 50000)):
+        assert (k >= 0).all()
+        assert np.allclose(np.bincount(k, minlength=3)/n, AREAS/AREAS.sum(), atol=0.01)
+
+def test_samples_stay_inside():
+    rng = random.Random(2)
+    assert all(point_in_poly(*BD_MAP.sample(rng), BD_POLY) for _ in range(2000))
+    xs, ys = BD_MAP.sample_n(5000, rng)
+    assert all(point_in_poly(x, y, BD_POLY) for x, y in zip(xs, ys))